@@ -10,58 +10,90 @@ This module handles:
 """
 
 import openai
-import json
-from typing import List, Dict, Optional
+import jiter
+import orjson
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from enum import Enum
+from typing import Callable, List, Dict, Optional, Tuple, TypedDict
+
+import numpy as np
+
+from llm_cache import ResponseCache, SemanticCache
+from llm_retry import AsyncRateLimiter, call_with_retry, call_with_retry_async, run_coroutine
 
 
 # ============================================================
 # COMPLIANCE CHECKING
 # ============================================================
 
-def check_regulation_compliance(
-    regulation: Dict,
-    proposal_chunk: str,
-    model: str = "gpt-5.2"
-) -> Dict:
-    """
-    Check if a document complies with a specific regulation.
-    
-    The check focuses on finding CONTRADICTIONS:
-    - If contradiction found → NON_COMPLIANT
-    - If no contradiction found → COMPLIANT
-    
-    Args:
-        regulation: Dict containing regulation details
-        proposal_chunk: Text of document to check
-        model: OpenAI model to use
-    
-    Returns:
-        Dict with compliance status and details
-    """
-    
-    reg_name = regulation.get('regulation_name', 'Unknown')
-    reg_id = regulation.get('regulation_id', 'N/A')
-    
-    description = regulation.get('description', {})
-    if isinstance(description, dict):
-        brief = description.get('brief_summary', 'N/A')
-    else:
-        brief = str(description)[:500]
-    
-    requirements = regulation.get('requirements', {})
-    restrictions = regulation.get('restrictions', {})
+CCM_SYSTEM_PROMPT = """You are the Compliance Classification Module (CCM) of ARCCS.
+
+Your task is to check documents for regulatory CONTRADICTIONS.
+
+RULE 1: Assume from the beginning that you have all the necessary information to make a decision. If, however, essential details are missing and you cannot properly evaluate the case, then the result should be INSUFFICIENT_INFORMATION.
+
+RULE 2: If you have all the required information and you do not identify any contradiction between the compared elements, then the document is COMPLIANT.
+
+RULE 3: If you have all the required information and you identify a contradiction between the compared elements, then the document is NON_COMPLIANT.
+
+FINAL RULE: If you have all the necessary information but, for any reason, you still cannot reach a clear decision, then the result should be HUMAN_REQUIRED.
+
+Be precise. Return JSON only."""
+
+# Maximum number of in-flight requests in check_all_regulations
+DEFAULT_CONCURRENCY = 16
+
+# Exact-match cache shared across runs; pass it as response_cache to opt in
+CCM_RESPONSE_CACHE = ResponseCache(os.path.join(tempfile.gettempdir(), "arccs_ccm_cache"))
+
+
+class Status(str, Enum):
+    """Compliance statuses; members compare and hash equal to their string values."""
+    COMPLIANT = 'COMPLIANT'
+    NON_COMPLIANT = 'NON_COMPLIANT'
+    INSUFFICIENT_INFORMATION = 'INSUFFICIENT_INFORMATION'
+    HUMAN_REQUIRED = 'HUMAN_REQUIRED'
     
-    prompt = f"""REGULATION: {reg_name} ({reg_id})
-Summary: {brief}
-Requirements: {json.dumps(requirements, ensure_ascii=False)}
-Restrictions: {json.dumps(restrictions, ensure_ascii=False)}
+    def __str__(self) -> str:
+        return self.value
 
-DOCUMENT TO CHECK:
-{proposal_chunk}
 
----
+class ComplianceResult(TypedDict, total=False):
+    """Schema of the result dicts produced by the compliance checks."""
+    regulation_id: str
+    regulation_name: str
+    compliance_status: Status
+    contradiction_found: bool
+    has_relevant_information: bool
+    confidence_score: float
+    missing_information: Optional[str]
+    contradiction_details: Optional[str]
+    evidence: Optional[str]
+    explanation: str
+    error: str
+    cache_hit: bool
+    early_stopped: bool
 
-YOUR TASK: Find if the document CONTRADICTS this regulation.
+
+def _regulation_identity(regulation: Dict) -> Tuple[str, str]:
+    """Return the (regulation_id, regulation_name) pair used in results."""
+    return (
+        regulation.get('regulation_id', 'N/A'),
+        regulation.get('regulation_name', 'Unknown')
+    )
+
+
+# Regulation-independent part of the user prompt. It is placed first so that
+# system message + instructions form a prefix shared by every request,
+# which OpenAI's automatic prompt caching can reuse.
+CCM_TASK_INSTRUCTIONS = """YOUR TASK: Find if the DOCUMENT TO CHECK (given last) CONTRADICTS the REGULATION below.
 
 A CONTRADICTION means:
 - Document says X, but regulation REQUIRES Y (opposite things)
@@ -79,86 +111,555 @@ NOT A CONTRADICTION:
 - Regulation: "Notify within 72h" | Document: "Notify within 72 days" → COMPLIANT
 - Regulation: "Users must be 16+ in EU" | Document: "Users must be 16 or older" → COMPLIANT
 
-
 ---
 
 Search the document for ANY statement that DIRECTLY CONTRADICTS the regulation.
 
 Return JSON:
-{{
-    "regulation_id": "{reg_id}",
-    "regulation_name": "{reg_name}",
+{
     "contradiction_found": true/false,
     "has_relevant_information": true/false,
+    "confidence_score": 0.0-1.0,
     "missing_information": "If has_relevant_information is false: explain what information is missing. Otherwise: null",
     "contradiction_details": "If found: quote the document text and explain the conflict. If not found: null",
-    "compliance_status": "NON_COMPLIANT if contradiction found, COMPLIANT if no contradiction and has info, INSUFFICIENT_INFORMATION if no relevant info found, HUMAN_REQUIRED if unclear",
     "evidence": "Quote from document (or null if no relevant info)",
-    "confidence_score": 0.0-1.0,
     "explanation": "Detailed justification for the assessment"
-}}"""
+}
+
+---
+
+"""
+
+
+def _drop_empty(value):
+    """Recursively remove null/empty entries, which carry no information for the model."""
+    if isinstance(value, dict):
+        cleaned = {k: _drop_empty(v) for k, v in value.items()}
+        return {k: v for k, v in cleaned.items() if v not in (None, "", "null", [], {})}
+    if isinstance(value, list):
+        cleaned = [_drop_empty(v) for v in value]
+        return [v for v in cleaned if v not in (None, "", "null", [], {})]
+    return value
+
 
+def _build_regulation_prompt(regulation: Dict) -> str:
+    """
+    Render everything in the user prompt except the document itself.
+    
+    The result depends only on the regulation, so it can be built once and
+    reused for every document checked against that regulation.
+    """
+    return CCM_TASK_INSTRUCTIONS + _regulation_text(regulation) + """
+
+---
+
+DOCUMENT TO CHECK:
+"""
+
+
+def _regulation_text(regulation: Dict) -> str:
+    """Name, summary, requirements and restrictions of a regulation, as shown to the model."""
+    reg_id, reg_name = _regulation_identity(regulation)
+    
+    description = regulation.get('description', {})
+    if isinstance(description, dict):
+        brief = description.get('brief_summary', 'N/A')
+    else:
+        brief = str(description)[:500]
+    
+    requirements = _drop_empty(regulation.get('requirements', {}))
+    restrictions = _drop_empty(regulation.get('restrictions', {}))
+    
+    return f"""REGULATION: {reg_name} ({reg_id})
+Summary: {brief}
+Requirements: {orjson.dumps(requirements).decode()}
+Restrictions: {orjson.dumps(restrictions).decode()}"""
+
+
+def _build_request_kwargs(
+    regulation: Dict,
+    proposal_chunk: str,
+    model: str,
+    stream: bool = False
+) -> Dict:
+    """Build the chat.completions.create arguments for a compliance check."""
+    request_kwargs = {
+        "model": model,
+        "messages": [
+            {
+                "role": "system",
+                "content": CCM_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": _build_regulation_prompt(regulation) + proposal_chunk
+            }
+        ],
+        "temperature": 0.0,
+        "response_format": {"type": "json_object"}
+    }
+    if stream:
+        request_kwargs["stream"] = True
+    return request_kwargs
+
+
+# ============================================================
+# RELEVANT PASSAGE SELECTION
+# ============================================================
+
+# Target size of the passages a document is split into for selection
+PASSAGE_CHARS = 2000
+PASSAGE_EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Maximum number of texts sent in one embeddings request
+EMBEDDING_BATCH_SIZE = 128
+
+# Regulation embeddings by model and regulation text, so checking further
+# documents against the same regulations only embeds the new passages
+_REGULATION_EMBEDDINGS: Dict[str, np.ndarray] = {}
+_REGULATION_EMBEDDINGS_SIZE = 4096
+_REGULATION_EMBEDDINGS_LOCK = threading.Lock()
+
+
+def split_into_passages(text: str, max_chars: int = PASSAGE_CHARS) -> List[str]:
+    """
+    Split a document into passages of about `max_chars`, on paragraph boundaries.
+    
+    Paragraphs longer than `max_chars` are cut into `max_chars` pieces.
+    """
+    passages = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        while len(paragraph) > max_chars:
+            if current:
+                passages.append(current)
+                current = ""
+            passages.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + 2 + len(paragraph) > max_chars:
+            passages.append(current)
+            current = paragraph
+        else:
+            current = current + "\n\n" + paragraph if current else paragraph
+    if current.strip():
+        passages.append(current)
+    return passages
+
+
+def _embed_texts(texts: List[str], model: str) -> np.ndarray:
+    """
+    Embed `texts` in requests of at most EMBEDDING_BATCH_SIZE texts.
+    
+    Returns:
+        Array with one L2-normalized row per text, in the order of `texts`
+    """
+    # Retries are handled by call_with_retry, not by the SDK
+    embeddings = openai.with_options(max_retries=0).embeddings
+    rows = []
+    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        batch = texts[start:start + EMBEDDING_BATCH_SIZE]
+        response = call_with_retry(lambda: embeddings.create(model=model, input=batch))
+        rows.extend(item.embedding for item in sorted(response.data, key=lambda d: d.index))
+    
+    vectors = np.array(rows, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _regulation_embeddings(regulations: List[Dict], model: str) -> np.ndarray:
+    """Embed the regulation texts, reusing the embeddings kept from earlier calls."""
+    texts = {}
+    keys = []
+    for regulation in regulations:
+        text = _regulation_text(regulation)
+        key = ResponseCache.make_key(model, text)
+        texts[key] = text
+        keys.append(key)
+    
+    with _REGULATION_EMBEDDINGS_LOCK:
+        vectors = {key: _REGULATION_EMBEDDINGS[key] for key in texts if key in _REGULATION_EMBEDDINGS}
+    missing = [key for key in texts if key not in vectors]
+    
+    if missing:
+        new_vectors = _embed_texts([texts[key] for key in missing], model)
+        with _REGULATION_EMBEDDINGS_LOCK:
+            for key, vector in zip(missing, new_vectors):
+                if len(_REGULATION_EMBEDDINGS) >= _REGULATION_EMBEDDINGS_SIZE:
+                    del _REGULATION_EMBEDDINGS[next(iter(_REGULATION_EMBEDDINGS))]
+                _REGULATION_EMBEDDINGS[key] = vectors[key] = vector
+    
+    return np.stack([vectors[key] for key in keys])
+
+
+def select_relevant_passages(
+    regulations: List[Dict],
+    proposal_chunk: str,
+    top_k: int,
+    embedding_model: str = PASSAGE_EMBEDDING_MODEL
+) -> List[str]:
+    """
+    Reduce the document to the passages most relevant to each regulation.
+    
+    The passages are embedded once, and regulation embeddings are kept in
+    memory across calls; every regulation gets its `top_k` most similar
+    passages, kept in document order. When the document has no more than
+    `top_k` passages, or an embedding request fails, every regulation gets
+    the full document.
+    
+    Args:
+        regulations: List of regulation dicts
+        proposal_chunk: Text of document to check
+        top_k: Number of passages kept per regulation
+        embedding_model: OpenAI embedding model
+    
+    Returns:
+        One document text per regulation, in the same order as `regulations`
+    """
+    passages = split_into_passages(proposal_chunk)
+    if len(passages) <= top_k:
+        return [proposal_chunk] * len(regulations)
+    
     try:
-        response = openai.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are the Compliance Classification Module (CCM) of ARCCS.
+        passage_vectors = _embed_texts(passages, embedding_model)
+        regulation_vectors = _regulation_embeddings(regulations, embedding_model)
+    except Exception as e:
+        print (e)
+        return [proposal_chunk] * len(regulations)
+    
+    # Cosine similarity of every (regulation, passage) pair
+    scores = regulation_vectors @ passage_vectors.T
+    best = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+    return [
+        "\n\n[...]\n\n".join(passages[i] for i in np.sort(row))
+        for row in best
+    ]
 
-Your task is to check documents for regulatory CONTRADICTIONS.
 
-RULE 1: Assume from the beginning that you have all the necessary information to make a decision. If, however, essential details are missing and you cannot properly evaluate the case, then the result should be INSUFFICIENT_INFORMATION.
+def _classify_result(regulation: Dict, result: Dict) -> ComplianceResult:
+    """
+    Turn a parsed model response into a compliance result.
+    
+    The regulation identity is filled in locally (the model is not asked to
+    echo it) and the ARCCS classification priorities are applied.
+    """
+    result['regulation_id'], result['regulation_name'] = _regulation_identity(regulation)
+    
+    contradiction_found = result.get('contradiction_found', False)
+    has_info = result.get('has_relevant_information', True)
+    confidence = result.get('confidence_score', 0.5)
+    
+    # Priority 1: If contradiction found → NON_COMPLIANT
+    if contradiction_found == True:
+        result['compliance_status'] = Status.NON_COMPLIANT
+    # Priority 2: If no relevant information → INSUFFICIENT_INFORMATION
+    elif has_info == False:
+        result['compliance_status'] = Status.INSUFFICIENT_INFORMATION
+    # Priority 3: If low confidence (<0.7) → HUMAN_REQUIRED
+    elif confidence < 0.7:
+        result['compliance_status'] = Status.HUMAN_REQUIRED
+    # Priority 4: Has info, no contradiction, good confidence → COMPLIANT
+    else:
+        result['compliance_status'] = Status.COMPLIANT
+    
+    return result
 
-RULE 2: If you have all the required information and you do not identify any contradiction between the compared elements, then the document is COMPLIANT.
 
-RULE 3: If you have all the required information and you identify a contradiction between the compared elements, then the document is NON_COMPLIANT.
+def _error_result(regulation: Dict, error: Exception) -> ComplianceResult:
+    """Build the fallback result returned when a check fails."""
+    reg_id, reg_name = _regulation_identity(regulation)
+    return {
+        "regulation_id": reg_id,
+        "regulation_name": reg_name,
+        "contradiction_found": False,
+        "compliance_status": Status.COMPLIANT,
+        "explanation": f"Error during analysis: {str(error)}",
+        "error": str(error)
+    }
 
-FINAL RULE: If you have all the necessary information but, for any reason, you still cannot reach a clear decision, then the result should be HUMAN_REQUIRED.
 
-Be precise. Return JSON only."""
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.0,
-            response_format={"type": "json_object"}
-        )
+def _request_cache_key(request_kwargs: Dict) -> str:
+    """Hash the model and messages of a request for the exact-match cache."""
+    return ResponseCache.make_key(
+        request_kwargs["model"],
+        # Early-stopped responses are incomplete, so keep them apart
+        "stream" if request_kwargs.get("stream") else "full",
+        *(message["content"] for message in request_kwargs["messages"])
+    )
+
+
+def _parse_json(text: str):
+    """Parse a complete JSON document returned by the API."""
+    return jiter.from_json(text.encode("utf-8"))
+
+
+def _parse_partial(buffer: str) -> Dict:
+    """Parse a possibly truncated JSON object streamed from the model."""
+    try:
+        parsed = jiter.from_json(buffer.encode("utf-8"), partial_mode="trailing-strings")
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _is_settled_compliant(partial: Dict) -> bool:
+    """
+    Whether a partial response is already certain to classify as COMPLIANT.
+    
+    confidence_score is only trusted once the following key has started,
+    which guarantees the number was not cut off mid-token.
+    """
+    confidence = partial.get('confidence_score')
+    return (
+        partial.get('contradiction_found') is False
+        and partial.get('has_relevant_information') is True
+        and 'missing_information' in partial
+        and isinstance(confidence, (int, float))
+        and confidence >= 0.7
+    )
+
+
+def _read_stream(stream) -> Tuple[Dict, bool]:
+    """
+    Accumulate a streamed response, stopping once the verdict is COMPLIANT.
+    
+    Returns:
+        Tuple of (parsed response, whether generation was stopped early)
+    """
+    buffer = ""
+    with stream:
+        for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            buffer += chunk.choices[0].delta.content
+            if _is_settled_compliant(_parse_partial(buffer)):
+                return _parse_partial(buffer), True
+    return _parse_json(buffer), False
+
+
+async def _read_stream_async(stream) -> Tuple[Dict, bool]:
+    """Async counterpart of _read_stream."""
+    buffer = ""
+    try:
+        async for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            buffer += chunk.choices[0].delta.content
+            if _is_settled_compliant(_parse_partial(buffer)):
+                return _parse_partial(buffer), True
+    finally:
+        await stream.close()
+    return _parse_json(buffer), False
+
+
+def _complete(request_kwargs: Dict) -> Tuple[Dict, bool]:
+    """
+    Send a compliance request and parse the model's JSON answer.
+    
+    Returns:
+        Tuple of (parsed response, whether generation was stopped early)
+    """
+    # Retries are handled by call_with_retry, not by the SDK
+    response = openai.with_options(max_retries=0).chat.completions.create(**request_kwargs)
+    if request_kwargs.get("stream"):
+        return _read_stream(response)
+    return _parse_json(response.choices[0].message.content), False
+
+
+async def _complete_async(
+    client: openai.AsyncOpenAI,
+    request_kwargs: Dict,
+    rate_limiter: Optional[AsyncRateLimiter] = None
+) -> Tuple[Dict, bool]:
+    """Async counterpart of _complete, optionally throttled by `rate_limiter`."""
+    if rate_limiter is not None:
+        await rate_limiter.acquire()
+    response = await client.chat.completions.create(**request_kwargs)
+    if request_kwargs.get("stream"):
+        return await _read_stream_async(response)
+    return _parse_json(response.choices[0].message.content), False
+
+
+def check_regulation_compliance(
+    regulation: Dict,
+    proposal_chunk: str,
+    model: str = "gpt-5.2",
+    semantic_cache: Optional[SemanticCache] = None,
+    response_cache: Optional[ResponseCache] = None,
+    early_stop: bool = False
+) -> ComplianceResult:
+    """
+    Check if a document complies with a specific regulation.
+    
+    The check focuses on finding CONTRADICTIONS:
+    - If contradiction found → NON_COMPLIANT
+    - If no contradiction found → COMPLIANT
+    
+    Args:
+        regulation: Dict containing regulation details
+        proposal_chunk: Text of document to check
+        model: OpenAI model to use
+        semantic_cache: Optional SemanticCache; a hit on a near-identical
+                        document skips the model call entirely
+        response_cache: Exact-match cache consulted first, e.g.
+                        CCM_RESPONSE_CACHE (None, the default, disables it)
+        early_stop: Stream the response and stop generating as soon as the
+                    verdict is known to be COMPLIANT. Such results carry
+                    'early_stopped': True and may lack explanation/evidence
+    
+    Returns:
+        Dict with compliance status and details
+        (includes 'cache_hit': True when served from a cache)
+    """
+    try:
+        request_kwargs = _build_request_kwargs(regulation, proposal_chunk, model, stream=early_stop)
+        cache_key = _request_cache_key(request_kwargs)
+        if response_cache is not None:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached, cache_hit=True)
         
-        result = json.loads(response.choices[0].message.content)
+        embedding = None
+        if semantic_cache is not None:
+            embedding = call_with_retry(lambda: semantic_cache.embed(proposal_chunk))
+            cached = semantic_cache.lookup(_regulation_identity(regulation)[0], embedding)
+            if cached is not None:
+                return cached
         
-        # Apply classification logic based on findings
-        contradiction_found = result.get('contradiction_found', False)
-        has_info = result.get('has_relevant_information', True)
-        confidence = result.get('confidence_score', 0.5)
+        parsed, stopped = call_with_retry(lambda: _complete(request_kwargs))
         
-        # Priority 1: If contradiction found → NON_COMPLIANT
-        if contradiction_found == True:
-            result['compliance_status'] = 'NON_COMPLIANT'
-        # Priority 2: If no relevant information → INSUFFICIENT_INFORMATION
-        elif has_info == False:
-            result['compliance_status'] = 'INSUFFICIENT_INFORMATION'
-        # Priority 3: If low confidence (<0.7) → HUMAN_REQUIRED
-        elif confidence < 0.7:
-            result['compliance_status'] = 'HUMAN_REQUIRED'
-        # Priority 4: Has info, no contradiction, good confidence → COMPLIANT
-        else:
-            result['compliance_status'] = 'COMPLIANT'
+        result = _classify_result(regulation, parsed)
+        if stopped:
+            result['early_stopped'] = True
+        if response_cache is not None:
+            response_cache.set(cache_key, result)
+        if semantic_cache is not None and not stopped:
+            semantic_cache.store(_regulation_identity(regulation)[0], embedding, result)
+        return result
+        
+    except Exception as e:
+        print (e)
+        return _error_result(regulation, e)
+
+
+async def _check_regulation_compliance_async(
+    client: openai.AsyncOpenAI,
+    semaphore: asyncio.Semaphore,
+    regulation: Dict,
+    proposal_chunk: str,
+    model: str,
+    semantic_cache: Optional[SemanticCache] = None,
+    proposal_embedding: Optional[List[float]] = None,
+    response_cache: Optional[ResponseCache] = None,
+    early_stop: bool = False,
+    rate_limiter: Optional[AsyncRateLimiter] = None
+) -> ComplianceResult:
+    """Async counterpart of check_regulation_compliance using a shared client."""
+    try:
+        request_kwargs = _build_request_kwargs(regulation, proposal_chunk, model, stream=early_stop)
+        cache_key = _request_cache_key(request_kwargs)
+        if response_cache is not None:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached, cache_hit=True)
+        
+        if semantic_cache is not None:
+            cached = semantic_cache.lookup(_regulation_identity(regulation)[0], proposal_embedding)
+            if cached is not None:
+                return cached
+        
+        async with semaphore:
+            parsed, stopped = await call_with_retry_async(
+                lambda: _complete_async(client, request_kwargs, rate_limiter)
+            )
         
+        result = _classify_result(regulation, parsed)
+        if stopped:
+            result['early_stopped'] = True
+        if response_cache is not None:
+            response_cache.set(cache_key, result)
+        if semantic_cache is not None and not stopped:
+            semantic_cache.store(_regulation_identity(regulation)[0], proposal_embedding, result)
         return result
         
     except Exception as e:
         print (e)
-        return {
-            "regulation_id": reg_id,
-            "regulation_name": reg_name,
-            "contradiction_found": False,
-            "compliance_status": "COMPLIANT",
-            "explanation": f"Error during analysis: {str(e)}",
-            "error": str(e)
-        }
+        return _error_result(regulation, e)
+
+
+def _print_check_status(result: Dict):
+    """Print the one-line verdict for a finished compliance check."""
+    status = result.get('compliance_status', 'UNKNOWN')
+    
+    if status == Status.NON_COMPLIANT:
+        print(f"   ❌ NON_COMPLIANT - Contradiction found!")
+        if result.get('contradiction_details'):
+            print(f"      → {result['contradiction_details'][:80]}...")
+    elif status == Status.INSUFFICIENT_INFORMATION:
+        print(f"   ⚠️ INSUFFICIENT_INFORMATION - Missing data")
+        if result.get('missing_information'):
+            print(f"      → {result['missing_information'][:80]}...")
+    elif status == Status.HUMAN_REQUIRED:
+        print(f"   🔍 HUMAN_REQUIRED - Low confidence ({result.get('confidence_score', 0):.0%})")
+    else:
+        print(f"   ✅ COMPLIANT")
+
+
+async def _check_all_regulations_async(
+    regulations: List[Dict],
+    proposal_chunk: str,
+    model: str,
+    concurrency: int,
+    verbose: bool,
+    semantic_cache: Optional[SemanticCache] = None,
+    response_cache: Optional[ResponseCache] = None,
+    early_stop: bool = False,
+    max_requests_per_minute: Optional[float] = None,
+    on_result: Optional[Callable[[int, Dict, ComplianceResult], None]] = None,
+    documents: Optional[List[str]] = None
+) -> List[ComplianceResult]:
+    """Run all compliance checks concurrently, preserving input order."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    rate_limiter = AsyncRateLimiter(max_requests_per_minute) if max_requests_per_minute else None
+    # Retries are handled by call_with_retry_async, not by the SDK
+    client = openai.AsyncOpenAI(api_key=openai.api_key, max_retries=0)
+    
+    # The document is the same for every regulation, so embed it only once
+    proposal_embedding = None
+    if semantic_cache is not None:
+        try:
+            proposal_embedding = call_with_retry(lambda: semantic_cache.embed(proposal_chunk))
+        except Exception as e:
+            print (e)
+            semantic_cache = None
+    
+    async def run(index: int, reg: Dict) -> Tuple[int, Dict]:
+        document = documents[index] if documents is not None else proposal_chunk
+        result = await _check_regulation_compliance_async(
+            client, semaphore, reg, document, model,
+            semantic_cache, proposal_embedding, response_cache, early_stop,
+            rate_limiter
+        )
+        return index, result
+    
+    results: List[Optional[Dict]] = [None] * len(regulations)
+    tasks = [run(i, reg) for i, reg in enumerate(regulations)]
+    
+    try:
+        for done, task in enumerate(asyncio.as_completed(tasks), 1):
+            i, result = await task
+            results[i] = result
+            
+            if verbose:
+                reg_name = regulations[i].get('regulation_name') or 'Unknown'
+                print(f"⚖️ [{done}/{len(regulations)}] {reg_name[:55]}...")
+                _print_check_status(result)
+            if on_result is not None:
+                on_result(i, regulations[i], result)
+    finally:
+        await client.close()
+    
+    return results
 
 
 def check_all_regulations(
@@ -166,58 +667,185 @@ def check_all_regulations(
     proposal_chunk: str,
     model: str = "gpt-5.2",
     only_applicable: bool = True,
-    verbose: bool = True
-) -> List[Dict]:
+    verbose: bool = True,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    semantic_cache: Optional[SemanticCache] = None,
+    response_cache: Optional[ResponseCache] = None,
+    early_stop: bool = False,
+    max_requests_per_minute: Optional[float] = None,
+    on_result: Optional[Callable[[int, Dict, ComplianceResult], None]] = None,
+    relevant_passages: Optional[int] = None
+) -> List[ComplianceResult]:
     """
     Check compliance against multiple regulations.
     
+    Requests are dispatched concurrently through the async OpenAI client,
+    with at most `concurrency` of them in flight at any time. Transient API
+    errors (rate limits, timeouts, ...) are retried with exponential backoff.
+    Results are returned in the same order as `regulations`.
+    
     Args:
         regulations: List of regulation dicts
         proposal_chunk: Text of document to check
         model: OpenAI model to use
         only_applicable: Whether to skip non-applicable regulations
         verbose: Whether to print progress
+        concurrency: Maximum number of concurrent API requests
+        semantic_cache: Optional SemanticCache consulted before each request
+        response_cache: Exact-match cache consulted first, e.g.
+                        CCM_RESPONSE_CACHE (None, the default, disables it)
+        early_stop: Stop generation once a verdict is known to be COMPLIANT
+                    (see check_regulation_compliance)
+        max_requests_per_minute: Optional cap on request starts per minute
+        on_result: Optional callback on_result(index, regulation, result),
+                   called as each check completes (in completion order)
+        relevant_passages: If set, check each regulation only against the
+                           this many most relevant passages of the document
+                           (see select_relevant_passages) instead of all of
+                           it; `semantic_cache` is then not used
     
     Returns:
         List of compliance check results
     """
-    results = []
-    
     if verbose:
         print(f"\n{'='*60}")
         print(f"🔍 ARCCS - CCM: Compliance Classification Module")
         print(f"{'='*60}")
         print(f"Checking {len(regulations)} regulations...\n")
     
+    if not regulations:
+        return []
+    
+    documents = None
+    if relevant_passages:
+        documents = select_relevant_passages(regulations, proposal_chunk, relevant_passages)
+        # Semantic verdicts are matched on the full document's embedding, so
+        # they do not apply to checks against selected passages
+        semantic_cache = None
+    
+    results = run_coroutine(_check_all_regulations_async(
+        regulations=regulations,
+        proposal_chunk=proposal_chunk,
+        model=model,
+        concurrency=concurrency,
+        verbose=verbose,
+        semantic_cache=semantic_cache,
+        response_cache=response_cache,
+        early_stop=early_stop,
+        max_requests_per_minute=max_requests_per_minute,
+        on_result=on_result,
+        documents=documents
+    ))
+    if response_cache is not None:
+        response_cache.flush()
+    if semantic_cache is not None:
+        semantic_cache.flush()
+    return results
+
+
+def check_all_regulations_batch(
+    regulations: List[Dict],
+    proposal_chunk: str,
+    model: str = "gpt-5.2",
+    poll_interval: float = 30.0,
+    verbose: bool = True
+) -> List[ComplianceResult]:
+    """
+    Check compliance against multiple regulations using the OpenAI Batch API.
+    
+    Suited to offline audits: requests are billed at the batch rate and are
+    not subject to per-request rate limits, but results may take up to 24h.
+    The same prompts and classification logic as check_regulation_compliance
+    are used, so results share the same schema.
+    
+    Args:
+        regulations: List of regulation dicts
+        proposal_chunk: Text of document to check
+        model: OpenAI model to use
+        poll_interval: Seconds to wait between batch status checks
+        verbose: Whether to print progress
+    
+    Returns:
+        List of compliance check results, in the same order as `regulations`
+    """
+    if not regulations:
+        return []
+    
+    # custom_id must be unique within a batch, so use the list position
+    # rather than regulation_id (which is not guaranteed to be unique)
+    lines = []
+    for i, reg in enumerate(regulations):
+        lines.append(orjson.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _build_request_kwargs(reg, proposal_chunk, model)
+        }))
+    payload = b"\n".join(lines) + b"\n"
+    
+    if verbose:
+        print(f"\n{'='*60}")
+        print(f"🔍 ARCCS - CCM: Compliance Classification Module (Batch API)")
+        print(f"{'='*60}")
+        print(f"Submitting {len(regulations)} regulations...\n")
+    
+    batch_file = call_with_retry(lambda: openai.files.create(
+        file=("ccm_batch.jsonl", payload),
+        purpose="batch"
+    ))
+    batch = call_with_retry(lambda: openai.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    ))
+    
+    if verbose:
+        print(f"📦 Batch submitted: {batch.id}")
+    
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_interval)
+        batch = call_with_retry(lambda: openai.batches.retrieve(batch.id))
+        if verbose and batch.request_counts is not None:
+            counts = batch.request_counts
+            print(f"   ⏳ {batch.status}: {counts.completed}/{counts.total} done")
+    
+    if verbose:
+        print(f"📦 Batch finished with status: {batch.status}")
+    
+    responses = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        output = call_with_retry(lambda: openai.files.content(file_id))
+        for line in output.text.splitlines():
+            if line.strip():
+                entry = _parse_json(line)
+                responses[entry["custom_id"]] = entry
+    
+    results = []
     for i, reg in enumerate(regulations):
-        reg_name = reg.get('regulation_name') or 'Unknown'
-        reg_name = reg_name[:55] if reg_name else 'Unknown'
+        entry = responses.get(str(i))
+        try:
+            if entry is None:
+                raise RuntimeError(f"No batch response (batch status: {batch.status})")
+            if entry.get("error"):
+                raise RuntimeError(entry["error"].get("message", entry["error"]))
+            
+            response = entry["response"]
+            if response.get("status_code") != 200:
+                raise RuntimeError(f"Request failed with status {response.get('status_code')}")
+            
+            content = response["body"]["choices"][0]["message"]["content"]
+            result = _classify_result(reg, _parse_json(content))
+        except Exception as e:
+            print (e)
+            result = _error_result(reg, e)
         
         if verbose:
-            print(f"⚖️ [{i+1}/{len(regulations)}] {reg_name}...")
-        
-        result = check_regulation_compliance(
-            regulation=reg,
-            proposal_chunk=proposal_chunk,
-            model=model
-        )
+            reg_name = reg.get('regulation_name') or 'Unknown'
+            print(f"⚖️ [{i+1}/{len(regulations)}] {reg_name[:55]}...")
+            _print_check_status(result)
         
-        status = result.get('compliance_status', 'UNKNOWN')
-        
-        if verbose:
-            if status == 'NON_COMPLIANT':
-                print(f"   ❌ NON_COMPLIANT - Contradiction found!")
-                if result.get('contradiction_details'):
-                    print(f"      → {result['contradiction_details'][:80]}...")
-            elif status == 'INSUFFICIENT_INFORMATION':
-                print(f"   ⚠️ INSUFFICIENT_INFORMATION - Missing data")
-                if result.get('missing_information'):
-                    print(f"      → {result['missing_information'][:80]}...")
-            elif status == 'HUMAN_REQUIRED':
-                print(f"   🔍 HUMAN_REQUIRED - Low confidence ({result.get('confidence_score', 0):.0%})")
-            else:
-                print(f"   ✅ COMPLIANT")
-            
         results.append(result)
     
     return results
@@ -227,7 +855,15 @@ def check_all_regulations(
 # REPORT GENERATION
 # ============================================================
 
-def generate_compliance_report(results: List[Dict]) -> Dict:
+# Report section each status is listed under (COMPLIANT is not listed)
+_BUCKETS = {
+    Status.NON_COMPLIANT: 'violations',
+    Status.INSUFFICIENT_INFORMATION: 'needs_review',
+    Status.HUMAN_REQUIRED: 'needs_review',
+}
+
+
+def generate_compliance_report(results: List[ComplianceResult]) -> Dict:
     """
     Generate a comprehensive compliance report.
     
@@ -237,13 +873,20 @@ def generate_compliance_report(results: List[Dict]) -> Dict:
     Returns:
         Dict with summary, violations, and detailed results
     """
-    compliant = sum(1 for r in results if r.get('compliance_status') == 'COMPLIANT')
-    non_compliant = sum(1 for r in results if r.get('compliance_status') == 'NON_COMPLIANT')
-    insufficient_info = sum(1 for r in results if r.get('compliance_status') == 'INSUFFICIENT_INFORMATION')
-    human_required = sum(1 for r in results if r.get('compliance_status') == 'HUMAN_REQUIRED')
+    counts = Counter()
+    buckets = {'violations': [], 'needs_review': []}
+    
+    for r in results:
+        status = r.get('compliance_status')
+        counts[status] += 1
+        bucket = _BUCKETS.get(status)
+        if bucket is not None:
+            buckets[bucket].append(r)
     
-    violations = [r for r in results if r.get('compliance_status') == 'NON_COMPLIANT']
-    needs_review = [r for r in results if r.get('compliance_status') in ['INSUFFICIENT_INFORMATION', 'HUMAN_REQUIRED']]
+    compliant = counts[Status.COMPLIANT]
+    non_compliant = counts[Status.NON_COMPLIANT]
+    insufficient_info = counts[Status.INSUFFICIENT_INFORMATION]
+    human_required = counts[Status.HUMAN_REQUIRED]
     
     total = len(results)
     
@@ -268,8 +911,8 @@ def generate_compliance_report(results: List[Dict]) -> Dict:
             "total": total,
             "compliance_rate": round(compliance_rate, 1)
         },
-        "violations": violations,
-        "needs_review": needs_review,
+        "violations": buckets['violations'],
+        "needs_review": buckets['needs_review'],
         "detailed_results": results
     }
 
@@ -281,53 +924,58 @@ def print_detailed_report(report: Dict):
     Args:
         report: Report dict from generate_compliance_report
     """
-    print(f"\n{'='*70}")
-    print(f"📊 ARCCS COMPLIANCE REPORT")
-    print(f"{'='*70}")
+    # Render into a buffer and write it out once
+    out = io.StringIO()
     
-    print(f"\n{report['overall_status']}")
+    print(f"\n{'='*70}", file=out)
+    print(f"📊 ARCCS COMPLIANCE REPORT", file=out)
+    print(f"{'='*70}", file=out)
+    
+    print(f"\n{report['overall_status']}", file=out)
     
     s = report['summary']
-    print(f"\n📈 SUMMARY:")
-    print(f"   ✅ Compliant:           {s['compliant']}")
-    print(f"   ❌ Non-Compliant:       {s['non_compliant']}")
-    print(f"   ⚠️  Insufficient Info:   {s.get('insufficient_info', 0)}")
-    print(f"   � Human Required:      {s.get('human_required', 0)}")
-    print(f"   �📋 Total Checked:       {s['total']}")
-    print(f"   📊 Compliance Rate:     {s['compliance_rate']}%")
+    print(f"\n📈 SUMMARY:", file=out)
+    print(f"   ✅ Compliant:           {s['compliant']}", file=out)
+    print(f"   ❌ Non-Compliant:       {s['non_compliant']}", file=out)
+    print(f"   ⚠️  Insufficient Info:   {s.get('insufficient_info', 0)}", file=out)
+    print(f"   � Human Required:      {s.get('human_required', 0)}", file=out)
+    print(f"   �📋 Total Checked:       {s['total']}", file=out)
+    print(f"   📊 Compliance Rate:     {s['compliance_rate']}%", file=out)
     
     if report['violations']:
-        print(f"\n{'='*70}")
-        print(f"🚨 VIOLATIONS FOUND ({len(report['violations'])})")
-        print(f"{'='*70}")
+        print(f"\n{'='*70}", file=out)
+        print(f"🚨 VIOLATIONS FOUND ({len(report['violations'])})", file=out)
+        print(f"{'='*70}", file=out)
         
         for i, v in enumerate(report['violations'], 1):
-            print(f"\n{i}. {v.get('regulation_name', 'Unknown')}")
-            print(f"   ID: {v.get('regulation_id', 'N/A')}")
+            print(f"\n{i}. {v.get('regulation_name', 'Unknown')}", file=out)
+            print(f"   ID: {v.get('regulation_id', 'N/A')}", file=out)
             if v.get('contradiction_details'):
-                print(f"   Issue: {v['contradiction_details'][:200]}")
+                print(f"   Issue: {v['contradiction_details'][:200]}", file=out)
             if v.get('evidence'):
-                print(f"   Evidence: \"{v['evidence'][:100]}...\"")
+                print(f"   Evidence: \"{v['evidence'][:100]}...\"", file=out)
             if v.get('explanation'):
-                print(f"   Explanation: {v['explanation'][:150]}...")
+                print(f"   Explanation: {v['explanation'][:150]}...", file=out)
     
     if report.get('needs_review'):
-        print(f"\n{'='*70}")
-        print(f"⚠️ NEEDS REVIEW ({len(report['needs_review'])})")
-        print(f"{'='*70}")
+        print(f"\n{'='*70}", file=out)
+        print(f"⚠️ NEEDS REVIEW ({len(report['needs_review'])})", file=out)
+        print(f"{'='*70}", file=out)
         
         for i, r in enumerate(report['needs_review'], 1):
             status = r.get('compliance_status', 'UNKNOWN')
-            print(f"\n{i}. {r.get('regulation_name', 'Unknown')} [{status}]")
-            print(f"   ID: {r.get('regulation_id', 'N/A')}")
-            if status == 'INSUFFICIENT_INFORMATION' and r.get('missing_information'):
-                print(f"   Missing: {r['missing_information'][:150]}...")
-            elif status == 'HUMAN_REQUIRED':
-                print(f"   Confidence: {r.get('confidence_score', 0):.0%}")
+            print(f"\n{i}. {r.get('regulation_name', 'Unknown')} [{status}]", file=out)
+            print(f"   ID: {r.get('regulation_id', 'N/A')}", file=out)
+            if status == Status.INSUFFICIENT_INFORMATION and r.get('missing_information'):
+                print(f"   Missing: {r['missing_information'][:150]}...", file=out)
+            elif status == Status.HUMAN_REQUIRED:
+                print(f"   Confidence: {r.get('confidence_score', 0):.0%}", file=out)
             if r.get('explanation'):
-                print(f"   Note: {r['explanation'][:150]}...")
+                print(f"   Note: {r['explanation'][:150]}...", file=out)
+    
+    print(f"\n{'='*70}", file=out)
     
-    print(f"\n{'='*70}")
+    sys.stdout.write(out.getvalue())
 
 
 def export_report_to_json(report: Dict, filepath: str):
@@ -338,8 +986,8 @@ def export_report_to_json(report: Dict, filepath: str):
         report: Report dict
         filepath: Output file path
     """
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    with open(filepath, "wb") as f:
+        f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     print(f"💾 Report saved to '{filepath}'")
 
 
@@ -362,6 +1010,7 @@ def print_module_info():
 ║  Functions:                                                       ║
 ║    • check_regulation_compliance() - Check single regulation      ║
 ║    • check_all_regulations()       - Batch compliance check       ║
+║    • check_all_regulations_batch() - Offline OpenAI Batch API run ║
 ║    • generate_compliance_report()  - Create summary report        ║
 ║    • print_detailed_report()       - Display formatted report     ║
 ║    • export_report_to_json()       - Save report to file          ║
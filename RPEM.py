@@ -10,12 +10,24 @@ This module handles:
 """
 
 import openai
+import jiter
+import orjson
 import json
+import asyncio
+import os
 import re
-from typing import List, Dict, Optional
+import copy
+import hashlib
+import functools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Dict, Optional, Iterable, Iterator, Tuple, TypedDict, Union
 from unstructured.partition.pdf import partition_pdf
 from unstructured.documents.elements import Title
 
+from llm_cache import ResponseCache
+from llm_retry import call_with_retry, call_with_retry_async, run_coroutine
+
 
 # ============================================================
 # DOCUMENT PARSING
@@ -44,6 +56,38 @@ def load_pdf_document(filepath: str, strategy: str = "hi_res") -> List:
     return elements
 
 
+def load_pdf_documents(
+    filepaths: List[str],
+    strategy: str = "hi_res",
+    max_workers: Optional[int] = None
+) -> List[List]:
+    """
+    Load and parse several PDF documents in parallel worker processes.
+    
+    PDF partitioning (especially 'hi_res' layout detection/OCR) is CPU-bound,
+    so documents are spread over separate processes rather than threads.
+    
+    Args:
+        filepaths: Paths to the PDF files
+        strategy: Parsing strategy ('hi_res', 'fast', 'auto')
+        max_workers: Number of worker processes (default: half the CPU cores)
+    
+    Returns:
+        List of element lists, in the same order as `filepaths`
+    """
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 2) // 2)
+    
+    print(f"📄 Loading {len(filepaths)} documents with {max_workers} worker(s)")
+    
+    parse = functools.partial(partition_pdf, strategy=strategy, infer_table_structure=True)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        documents = list(executor.map(parse, filepaths))
+    
+    print(f"✅ Loaded {sum(len(elements) for elements in documents)} elements")
+    return documents
+
+
 def elements_to_markdown(elements: List) -> str:
     """
     Convert parsed PDF elements to markdown text.
@@ -54,82 +98,219 @@ def elements_to_markdown(elements: List) -> str:
     Returns:
         Markdown-formatted text
     """
-    md = ""
+    parts = []
+    append = parts.append
     for el in elements:
         if isinstance(el, Title):
-            md += f"\n## {el.text}\n"
+            append(f"\n## {el.text}\n")
         else:
-            md += f"{el.text}\n"
-    return md
+            append(f"{el.text}\n")
+    return "".join(parts)
 
 
-def split_into_sections(markdown_text: str) -> List[Dict[str, str]]:
+# Markdown header lines ("# ...", "## ...") that start a new section
+_HEADER_RE = re.compile(r'^(#+\s.*)$', re.MULTILINE)
+
+
+def iter_sections(markdown_text: str) -> Iterator[Dict[str, str]]:
     """
-    Split markdown text into sections based on headers.
+    Lazily split markdown text into sections based on headers.
+    
+    Sections are yielded as soon as the next header is found, without
+    materializing the split text. Text before the first header is ignored.
     
     Args:
         markdown_text: Full markdown text
     
-    Returns:
-        List of dicts with 'title' and 'content' keys
+    Yields:
+        Dicts with 'title' and 'content' keys
     """
-    pattern = r'(#+\s.*)'
-    parts = re.split(pattern, markdown_text)
-
-    sections = []
     current_title = None
-    current_content = ""
-
-    for part in parts:
-        if part.startswith("#"):
-            if current_title:
-                sections.append({
-                    "title": current_title,
-                    "content": current_content.strip()
-                })
-            current_title = part.strip()
-            current_content = ""
-        else:
-            current_content += part
-
+    content_start = 0
+    
+    for match in _HEADER_RE.finditer(markdown_text):
+        if current_title:
+            yield {
+                "title": current_title,
+                "content": markdown_text[content_start:match.start()].strip()
+            }
+        current_title = match.group(1).strip()
+        content_start = match.end()
+    
     if current_title:
-        sections.append({
+        yield {
             "title": current_title,
-            "content": current_content.strip()
-        })
+            "content": markdown_text[content_start:].strip()
+        }
+
 
-    return sections
+def split_into_sections(markdown_text: str) -> List[Dict[str, str]]:
+    """
+    Split markdown text into sections based on headers.
+    
+    Args:
+        markdown_text: Full markdown text
+    
+    Returns:
+        List of dicts with 'title' and 'content' keys
+    """
+    return list(iter_sections(markdown_text))
 
 
 # ============================================================
 # REGULATION EXTRACTION
 # ============================================================
 
-def extract_regulations_from_section(
-    section: Dict[str, str],
-    model: str = "gpt-4.1"
-) -> Dict:
+# Lexical prefilter: sections that cannot contain actionable requirements
+# are answered locally instead of being sent to the model
+MIN_SECTION_LENGTH = 300
+_INTRO_TITLE_RE = re.compile(
+    r'^#*\s*(?:Table of Contents|Contents|Preamble|Introduction|Overview|Recitals?)\b',
+    re.IGNORECASE
+)
+_MODAL_RE = re.compile(
+    r'\b(?:shall|must|may not|prohibited|required|obliged|entitled)\b',
+    re.IGNORECASE
+)
+_THRESHOLD_RE = re.compile(
+    r'\d+\s*(?:days?|hours?|months?|years?|%|EUR|euros?)',
+    re.IGNORECASE
+)
+
+
+def is_regulatory_candidate(section: Dict[str, str]) -> bool:
     """
-    Use AI to extract structured regulation data from a document section.
+    Cheap lexical check for whether a section may contain regulations.
+    
+    A section is rejected when its title marks it as introductory, when it
+    is shorter than MIN_SECTION_LENGTH, or when it contains neither modal
+    obligation wording (shall, must, ...) nor numeric thresholds.
     
     Args:
         section: Dict with 'title' and 'content' keys
-        model: OpenAI model to use
     
     Returns:
-        Dict with extracted regulations and metadata
+        True if the section should be sent to the model
     """
+    content = section['content']
+    if _INTRO_TITLE_RE.match(section['title']):
+        return False
+    if len(content) < MIN_SECTION_LENGTH:
+        return False
+    return bool(_MODAL_RE.search(content) or _THRESHOLD_RE.search(content))
+
+
+def _skipped_section_result(section: Dict[str, str]) -> Dict:
+    """Result for a section rejected by is_regulatory_candidate."""
+    return {
+        "contains_regulation": False,
+        "confidence_score": 0.0,
+        "section_summary": "Skipped by lexical prefilter - no actionable requirements detected",
+        "regulations": [],
+        "prefiltered": True,
+        "section_title": section["title"],
+        "original_content": section["content"][:500] + "..." if len(section["content"]) > 500 else section["content"]
+    }
+
+
+# Cheap model used to decide whether a section is worth a full extraction
+TRIAGE_MODEL = "gpt-4o-mini"
+
+TRIAGE_PROMPT = """Does the following document section contain SPECIFIC, ACTIONABLE regulatory requirements (obligations, prohibitions, procedures, thresholds, concrete definitions)?
+Answer false for tables of contents, preambles, introductions, summaries, or sections that only mention or list regulations without detailing them.
+Respond with JSON only: {"actionable": true} or {"actionable": false}"""
+
+
+def _build_triage_request(section: Dict[str, str], model: str) -> Dict:
+    """Build the chat.completions.create arguments for a triage call."""
+    return {
+        "model": model,
+        "messages": [
+            {
+                "role": "system",
+                "content": TRIAGE_PROMPT
+            },
+            {
+                "role": "user",
+                "content": f"SECTION TITLE: {section['title']}\n\nSECTION CONTENT:\n{section['content']}"
+            }
+        ],
+        "temperature": 0.0,
+        "max_tokens": 10,
+        "response_format": {"type": "json_object"}
+    }
+
+
+def _is_actionable(content: str) -> bool:
+    # Anything but an explicit "no" escalates to the full extraction
+    return jiter.from_json(content.encode("utf-8")).get("actionable") is not False
+
+
+def _quick_classify(section: Dict[str, str], model: str = TRIAGE_MODEL) -> bool:
+    """
+    Ask a cheap model whether a section has actionable requirements.
+    
+    Args:
+        section: Dict with 'title' and 'content' keys
+        model: OpenAI model to use for the triage
     
-    prompt = f"""You are a senior legal and compliance expert specializing in regulatory analysis. Analyze the following document section and extract ALL regulatory information in extreme detail.
+    Returns:
+        False only if the model says the section has no actionable
+        requirements (errors count as True, so the section is extracted)
+    """
+    try:
+        request = _build_triage_request(section, model)
+        response = call_with_retry(lambda: openai.chat.completions.create(**request))
+        return _is_actionable(response.choices[0].message.content)
+    except Exception as e:
+        print (e)
+        return True
 
-SECTION TITLE: {section['title']}
 
-SECTION CONTENT:
-{section['content']}
+async def _quick_classify_async(
+    client: openai.AsyncOpenAI,
+    semaphore: asyncio.Semaphore,
+    section: Dict[str, str],
+    model: str
+) -> bool:
+    """Async counterpart of _quick_classify using a shared client."""
+    try:
+        request = _build_triage_request(section, model)
+        async with semaphore:
+            response = await call_with_retry_async(
+                lambda: client.chat.completions.create(**request)
+            )
+        return _is_actionable(response.choices[0].message.content)
+    except Exception as e:
+        print (e)
+        return True
 
----
 
-CRITICAL FILTERING RULES - READ CAREFULLY:
+def _triaged_section_result(section: Dict[str, str]) -> Dict:
+    """Result for a section the triage model classified as non-regulatory."""
+    return {
+        "contains_regulation": False,
+        "confidence_score": 0.0,
+        "section_summary": "Skipped by triage model - no actionable requirements detected",
+        "is_introductory": True,
+        "regulations": [],
+        "triaged": True,
+        "section_title": section["title"],
+        "original_content": section["content"][:500] + "..." if len(section["content"]) > 500 else section["content"]
+    }
+
+
+RPEM_SYSTEM_PROMPT = "You are a senior legal and compliance expert. Extract regulatory details ONLY from sections with specific requirements. Skip introductory, summary, or overview sections that merely mention regulations without detailing them. Always respond with valid JSON only, no markdown formatting or code blocks."
+
+# Maximum number of in-flight requests in process_all_sections
+DEFAULT_CONCURRENCY = 8
+
+# Section results shared across runs; pass it as section_cache to opt in
+RPEM_SECTION_CACHE = ResponseCache(os.path.join(tempfile.gettempdir(), "arccs_rpem_cache"))
+
+
+# Rules and output schema shared by the single- and multi-section prompts
+EXTRACTION_INSTRUCTIONS = """CRITICAL FILTERING RULES - READ CAREFULLY:
 
 Before extracting any regulations, determine if this section is:
 
@@ -148,139 +329,139 @@ Before extracting any regulations, determine if this section is:
    - Contains concrete definitions, procedures, or thresholds
 
 If this is an introductory/general section, return:
-{{
+{
     "contains_regulation": false,
     "confidence_score": 0.0,
     "section_summary": "Introductory/overview section - regulations mentioned but not detailed here",
     "is_introductory": true,
     "regulations": []
-}}
+}
 
 ---
 
 If this section DOES contain detailed regulation information, provide a comprehensive JSON response with the following structure:
 
-{{
+{
     "contains_regulation": true/false,
     "confidence_score": 0.0-1.0,
     "section_summary": "Detailed summary of what this section covers",
     "is_introductory": false,
     
     "regulations": [
-        {{
+        {
             "regulation_id": "Official ID (e.g., GDPR Article 5, ISO 27001:2022)",
             "regulation_name": "Full official name of the regulation",
             "regulation_type": "law | directive | regulation | standard | guideline | framework | policy | article | clause",
             
-            "jurisdiction": {{
+            "jurisdiction": {
                 "geographic_scope": "EU | US | UK | International | Global | Country-specific",
                 "applicable_regions": ["List of specific regions/countries"],
                 "cross_border_applicability": true/false
-            }},
+            },
             
-            "domain": {{
+            "domain": {
                 "primary_domain": "Data Protection | Financial | Environmental | Health & Safety | Cybersecurity | AI Ethics | Consumer Protection | Employment | Tax | Trade",
                 "sub_domains": ["List of specific sub-areas"],
                 "industry_sectors": ["List of industries this applies to"]
-            }},
+            },
             
-            "description": {{
+            "description": {
                 "brief_summary": "One paragraph summary",
                 "detailed_explanation": "Comprehensive explanation of the regulation",
                 "purpose": "Why this regulation exists",
                 "legislative_intent": "What the lawmakers intended to achieve"
-            }},
+            },
             
-            "scope": {{
+            "scope": {
                 "what_it_covers": ["List of activities/processes covered"],
-                "who_it_applies_to": {{
+                "who_it_applies_to": {
                     "target_entities": ["Organizations", "Individuals", "Specific roles"],
                     "entity_types": ["Private companies", "Public bodies", "Non-profits"],
                     "size_thresholds": "Any size requirements (e.g., companies with >250 employees)",
                     "geographic_presence": "Location requirements"
-                }},
+                },
                 "what_it_does_not_cover": ["Explicitly excluded items"]
-            }},
+            },
             
-            "requirements": {{
+            "requirements": {
                 "mandatory_obligations": ["List of MUST DO requirements"],
                 "prohibited_actions": ["List of MUST NOT DO restrictions"],
                 "conditional_requirements": ["Requirements that apply under certain conditions"],
                 "documentation_requirements": ["Required records/documents"],
                 "reporting_requirements": ["Required reports/notifications"],
                 "timeline_requirements": ["Deadlines, response times, retention periods"]
-            }},
+            },
             
-            "restrictions": {{
+            "restrictions": {
                 "general_restrictions": ["Overall limitations imposed"],
                 "data_restrictions": ["Limits on data handling if applicable"],
                 "operational_restrictions": ["Limits on business operations"],
                 "technical_restrictions": ["Technical limitations required"],
                 "geographic_restrictions": ["Location-based limitations"]
-            }},
+            },
             
-            "rights_granted": {{
+            "rights_granted": {
                 "individual_rights": ["Rights given to individuals"],
                 "organizational_rights": ["Rights given to organizations"],
                 "how_to_exercise_rights": ["Process to claim these rights"]
-            }},
+            },
             
-            "exceptions": {{
+            "exceptions": {
                 "general_exceptions": ["When the regulation does NOT apply"],
                 "conditional_exemptions": ["Partial exemptions under conditions"],
                 "legitimate_interest_exceptions": ["Exceptions based on legitimate interests"],
                 "public_interest_exceptions": ["Government/public sector exceptions"],
                 "size_based_exceptions": ["Exemptions for small businesses etc."]
-            }},
+            },
             
-            "compliance_requirements": {{
+            "compliance_requirements": {
                 "technical_measures": ["Required technical implementations"],
                 "organizational_measures": ["Required policies/procedures"],
                 "security_measures": ["Security requirements"],
                 "training_requirements": ["Staff training needed"],
                 "audit_requirements": ["Audit/assessment requirements"],
                 "certification_requirements": ["Required certifications"]
-            }},
+            },
             
-            "enforcement": {{
+            "enforcement": {
                 "regulatory_authority": "Who enforces this",
-                "penalties": {{
+                "penalties": {
                     "financial_penalties": "Fines description and amounts",
                     "criminal_penalties": "Criminal consequences if any",
                     "administrative_penalties": "Administrative sanctions",
                     "reputational_consequences": "Public disclosure etc."
-                }},
+                },
                 "enforcement_mechanisms": ["How violations are detected/handled"]
-            }},
+            },
             
-            "dates": {{
+            "dates": {
                 "effective_date": "When it came into force",
                 "compliance_deadline": "When compliance was/is required",
                 "review_date": "When it will be reviewed",
                 "amendment_history": ["Previous changes"]
-            }},
+            },
             
-            "related_regulations": {{
+            "related_regulations": {
                 "parent_legislation": "Higher-level law this derives from",
                 "related_articles": ["Other articles in same regulation"],
                 "complementary_regulations": ["Other regulations that work together"],
                 "superseded_regulations": ["What this replaced"]
-            }},
+            },
             
-            "practical_implications": {{
+            "practical_implications": {
                 "implementation_steps": ["Steps to achieve compliance"],
                 "common_violations": ["Typical mistakes/violations"],
                 "best_practices": ["Recommended approaches"],
                 "compliance_checklist": ["Key items to verify"]
-            }},
+            },
             
             "keywords": ["Relevant search terms"],
-            "key_definitions": {{
+            "key_definitions": {
                 "term": "definition"
-            }}
-        }}
+            }
+        }
     ]
-}}
+}
 
 IMPORTANT: 
 - DO NOT extract regulations from introductory/overview sections
@@ -292,111 +473,593 @@ IMPORTANT:
 
 Return ONLY valid JSON."""
 
+# Sections whose content is at most this long are grouped into
+# multi-section requests by process_all_sections
+MAX_BATCHED_SECTION_CHARS = 3000
+
+# Upper bound on the combined section content of one grouped request
+MAX_BATCH_CHARS = 12000
+
+# Suggested batch_size for grouping short sections; process_all_sections
+# sends every section on its own unless a larger batch_size is passed
+GROUP_BATCH_SIZE = 5
+
+
+def _build_extraction_prompt(section: Dict[str, str]) -> str:
+    """Render the extraction prompt for a single section."""
+    return f"""You are a senior legal and compliance expert specializing in regulatory analysis. Analyze the following document section and extract ALL regulatory information in extreme detail.
+
+SECTION TITLE: {section['title']}
+
+SECTION CONTENT:
+{section['content']}
+
+---
+
+""" + EXTRACTION_INSTRUCTIONS
+
+
+def _build_batch_extraction_prompt(sections: List[Dict[str, str]]) -> str:
+    """Render one extraction prompt covering several sections."""
+    parts = [
+        f"You are a senior legal and compliance expert specializing in regulatory analysis. "
+        f"Analyze EACH of the following {len(sections)} document sections independently "
+        f"and extract ALL regulatory information in extreme detail."
+    ]
+    for i, section in enumerate(sections):
+        parts.append(f"=== SECTION {i} ===\nSECTION TITLE: {section['title']}\n\nSECTION CONTENT:\n{section['content']}")
+    parts.append("---")
+    parts.append(EXTRACTION_INSTRUCTIONS)
+    parts.append(
+        f"MULTIPLE SECTIONS: Apply the rules above to every section separately. "
+        f'Return a single JSON object {{"results": [...]}} whose array has exactly {len(sections)} '
+        f"elements; element i is the JSON response described above for SECTION i."
+    )
+    return "\n\n".join(parts)
+
+
+def _build_extraction_request(prompt: str, model: str) -> Dict:
+    """Build the chat.completions.create arguments for an extraction prompt."""
+    return {
+        "model": model,
+        "messages": [
+            {
+                "role": "system",
+                "content": RPEM_SYSTEM_PROMPT
+            },
+            {
+                "role": "user", 
+                "content": prompt
+            }
+        ],
+        "temperature": 0.1,
+        "response_format": {"type": "json_object"}
+    }
+
+
+def _attach_section(section: Dict[str, str], result: Dict) -> Dict:
+    """Add the section metadata to a parsed extraction result."""
+    result["section_title"] = section["title"]
+    result["original_content"] = section["content"][:500] + "..." if len(section["content"]) > 500 else section["content"]
+    return result
+
+
+def _extraction_result(section: Dict[str, str], content: str) -> Dict:
+    """Parse the model's answer and attach the section metadata."""
+    return _attach_section(section, jiter.from_json(content.encode("utf-8")))
+
+
+def _extraction_error(section: Dict[str, str], error: Exception) -> Dict:
+    """Build the fallback result returned when an extraction fails."""
+    return {
+        "section_title": section["title"],
+        "contains_regulation": False,
+        "confidence_score": 0.0,
+        "regulations": [],
+        "section_summary": None,
+        "error": str(error)
+    }
+
+
+def extract_regulations_from_section(
+    section: Dict[str, str],
+    model: str = "gpt-4.1",
+    triage_model: Optional[str] = None
+) -> Dict:
+    """
+    Use AI to extract structured regulation data from a document section.
+    
+    Args:
+        section: Dict with 'title' and 'content' keys
+        model: OpenAI model to use
+        triage_model: Optional cheap model asked first whether the section
+                      has actionable requirements; the full extraction
+                      only runs if it says yes
+    
+    Returns:
+        Dict with extracted regulations and metadata
+    """
+    if triage_model and not _quick_classify(section, triage_model):
+        return _triaged_section_result(section)
+    
     try:
-        response = openai.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a senior legal and compliance expert. Extract regulatory details ONLY from sections with specific requirements. Skip introductory, summary, or overview sections that merely mention regulations without detailing them. Always respond with valid JSON only, no markdown formatting or code blocks."
-                },
-                {
-                    "role": "user", 
-                    "content": prompt
-                }
-            ],
-            temperature=0.1,
-            response_format={"type": "json_object"}
-        )
+        request = _build_extraction_request(_build_extraction_prompt(section), model)
+        response = call_with_retry(lambda: openai.chat.completions.create(**request))
+        return _extraction_result(section, response.choices[0].message.content)
         
-        result = json.loads(response.choices[0].message.content)
-        result["section_title"] = section["title"]
-        result["original_content"] = section["content"][:500] + "..." if len(section["content"]) > 500 else section["content"]
-        return result
+    except Exception as e:
+        return _extraction_error(section, e)
+
+
+async def _extract_regulations_from_section_async(
+    client: openai.AsyncOpenAI,
+    semaphore: asyncio.Semaphore,
+    section: Dict[str, str],
+    model: str,
+    triage_model: Optional[str] = None
+) -> Dict:
+    """Async counterpart of extract_regulations_from_section using a shared client."""
+    if triage_model and not await _quick_classify_async(client, semaphore, section, triage_model):
+        return _triaged_section_result(section)
+    
+    try:
+        request = _build_extraction_request(_build_extraction_prompt(section), model)
+        async with semaphore:
+            response = await call_with_retry_async(
+                lambda: client.chat.completions.create(**request)
+            )
+        return _extraction_result(section, response.choices[0].message.content)
         
     except Exception as e:
-        return {
-            "section_title": section["title"],
-            "contains_regulation": False,
-            "confidence_score": 0.0,
-            "regulations": [],
-            "section_summary": None,
-            "error": str(e)
-        }
+        return _extraction_error(section, e)
+
+
+async def _extract_section_group_async(
+    client: openai.AsyncOpenAI,
+    semaphore: asyncio.Semaphore,
+    sections: List[Dict[str, str]],
+    model: str
+) -> List[Dict]:
+    """
+    Extract several sections with a single request.
+    
+    Raises ValueError if the response does not hold exactly one result
+    object per section, so the caller can fall back to one request each.
+    """
+    request = _build_extraction_request(_build_batch_extraction_prompt(sections), model)
+    async with semaphore:
+        response = await call_with_retry_async(
+            lambda: client.chat.completions.create(**request)
+        )
+    
+    results = jiter.from_json(response.choices[0].message.content.encode("utf-8")).get("results")
+    if (not isinstance(results, list) or len(results) != len(sections)
+            or not all(isinstance(r, dict) for r in results)):
+        raise ValueError(f"Grouped extraction did not return {len(sections)} results")
+    
+    return [_attach_section(section, result) for section, result in zip(sections, results)]
+
+
+def _group_sections(
+    sections: List[Dict[str, str]],
+    indices: List[int],
+    batch_size: int
+) -> List[List[int]]:
+    """
+    Split section indices into request groups.
+    
+    Short sections (<= MAX_BATCHED_SECTION_CHARS) are packed, in order, into
+    groups of at most `batch_size` sections and MAX_BATCH_CHARS characters;
+    every other section gets a group of its own.
+    """
+    groups = []
+    current = []
+    current_chars = 0
+    
+    for i in indices:
+        length = len(sections[i]['content'])
+        if batch_size <= 1 or length > MAX_BATCHED_SECTION_CHARS:
+            groups.append([i])
+            continue
+        if current and (len(current) == batch_size or current_chars + length > MAX_BATCH_CHARS):
+            groups.append(current)
+            current = []
+            current_chars = 0
+        current.append(i)
+        current_chars += length
+    
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _section_status(analysis: Dict) -> str:
+    """One-line outcome of a section analysis."""
+    if analysis.get("prefiltered"):
+        return "   ⏭️ Skipped (no regulatory language)"
+    elif analysis.get("triaged"):
+        return "   ⏭️ Skipped (triage: no actionable requirements)"
+    elif analysis.get("contains_regulation"):
+        reg_count = len(analysis.get("regulations", []))
+        return f"   ✅ Found {reg_count} regulation(s)"
+    else:
+        return "   ⚪ No regulations found"
+
+
+async def _process_sections_async(
+    sections: List[Dict[str, str]],
+    indices: List[int],
+    model: str,
+    triage_model: Optional[str],
+    concurrency: int,
+    batch_size: int,
+    verbose: bool,
+    on_result: Optional[Callable[[int, Dict], None]] = None
+) -> Dict[int, Dict]:
+    """Run the extractions for sections[i], i in indices, concurrently."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    # Retries are handled by call_with_retry_async, not by the SDK
+    client = openai.AsyncOpenAI(api_key=openai.api_key, max_retries=0)
+    
+    async def extract(index: int, triage: Optional[str]) -> Tuple[int, Dict]:
+        result = await _extract_regulations_from_section_async(
+            client, semaphore, sections[index], model, triage
+        )
+        return index, result
+    
+    async def run(group: List[int]) -> List[Tuple[int, Dict]]:
+        if len(group) == 1:
+            return [await extract(group[0], triage_model)]
+        
+        done = []
+        if triage_model:
+            verdicts = await asyncio.gather(*[
+                _quick_classify_async(client, semaphore, sections[i], triage_model)
+                for i in group
+            ])
+            done = [(i, _triaged_section_result(sections[i])) for i, ok in zip(group, verdicts) if not ok]
+            group = [i for i, ok in zip(group, verdicts) if ok]
+        
+        if len(group) > 1:
+            try:
+                results = await _extract_section_group_async(
+                    client, semaphore, [sections[i] for i in group], model
+                )
+                return done + list(zip(group, results))
+            except Exception as e:
+                print (e)
+        
+        # Single section left, or the grouped request failed: one request each
+        return done + list(await asyncio.gather(*[extract(i, None) for i in group]))
+    
+    results = {}
+    tasks = [run(group) for group in _group_sections(sections, indices, batch_size)]
+    
+    try:
+        for task in asyncio.as_completed(tasks):
+            for i, analysis in await task:
+                results[i] = analysis
+                
+                if verbose:
+                    title = sections[i]['title']
+                    title_preview = title[:50] + "..." if len(title) > 50 else title
+                    print(f"📖 [{len(results)}/{len(indices)}] {title_preview}\n{_section_status(analysis)}")
+                if on_result is not None:
+                    on_result(i, analysis)
+    finally:
+        await client.close()
+    
+    return results
 
 
 def process_all_sections(
     sections: List[Dict[str, str]],
     model: str = "gpt-4.1",
-    verbose: bool = True
+    verbose: bool = True,
+    prefilter: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    triage_model: Optional[str] = None,
+    batch_size: int = 1,
+    section_cache: Optional[ResponseCache] = None,
+    on_result: Optional[Callable[[int, Dict], None]] = None
 ) -> List[Dict]:
     """
     Process all document sections and extract regulations.
     
+    Sections are sent to the model concurrently (at most `concurrency`
+    requests in flight); results are returned in section order. Sections
+    with identical content (repeated boilerplate, definitions, ...) are
+    only sent to the model once; later copies reuse the result. If
+    `triage_model` is given (e.g. TRIAGE_MODEL), a cheap model screens each
+    section first and only sections it flags as actionable get the full
+    extraction. With `batch_size` above 1, short sections are extracted up
+    to `batch_size` at a time in one request.
+    With a `section_cache` (e.g. RPEM_SECTION_CACHE), results are cached by
+    model and section title and content, so unchanged sections are not sent
+    again on later runs.
+    
     Args:
         sections: List of section dicts with 'title' and 'content'
         model: OpenAI model to use
         verbose: Whether to print progress
+        prefilter: Skip the model for sections rejected by
+                   is_regulatory_candidate (off by default, since the
+                   lexical check can miss regulatory sections)
+        concurrency: Maximum number of simultaneous API requests
+        triage_model: Cheap model used to screen sections before the
+                      full extraction, e.g. TRIAGE_MODEL (None, the
+                      default, extracts every section)
+        batch_size: Maximum number of short sections per request, e.g.
+                    GROUP_BATCH_SIZE (1, the default, sends every section
+                    on its own)
+        section_cache: Cache of section results, e.g. RPEM_SECTION_CACHE
+                       (None, the default, disables caching)
+        on_result: Optional callback on_result(index, analysis), called once
+                   per section as its result becomes available (skipped and
+                   cached sections first, then extractions as they complete)
     
     Returns:
         List of analysis results for each section
     """
-    results = []
+    results: List[Optional[Dict]] = [None] * len(sections)
+    # Content hash -> index of the first section with that content
+    seen_content = {}
+    # Section index -> index of the section whose result it reuses
+    duplicates = {}
+    # Section index -> section_cache key
+    cache_keys = {}
+    cached_count = 0
+    to_extract = []
     
     if verbose:
-        print(f"\n{'='*60}")
-        print(f"🔍 RPEM: Processing {len(sections)} sections")
-        print(f"{'='*60}\n")
+        print(f"\n{'='*60}\n"
+              f"🔍 RPEM: Processing {len(sections)} sections\n"
+              f"{'='*60}\n")
     
     for i, section in enumerate(sections):
-        if verbose:
-            title_preview = section['title'][:50] + "..." if len(section['title']) > 50 else section['title']
-            print(f"📖 [{i+1}/{len(sections)}] {title_preview}")
+        if prefilter and not is_regulatory_candidate(section):
+            results[i] = _skipped_section_result(section)
+            if on_result is not None:
+                on_result(i, results[i])
+            continue
         
-        analysis = extract_regulations_from_section(section, model)
-        results.append(analysis)
+        content_hash = hashlib.blake2b(section['content'].encode("utf-8")).hexdigest()
+        if content_hash in seen_content:
+            duplicates[i] = seen_content[content_hash]
+            continue
+        seen_content[content_hash] = i
         
-        if verbose:
-            if analysis.get("contains_regulation"):
-                reg_count = len(analysis.get("regulations", []))
-                print(f"   ✅ Found {reg_count} regulation(s)")
-            else:
-                print(f"   ⚪ No regulations found")
+        if section_cache is not None:
+            cache_keys[i] = ResponseCache.make_key(
+                model, triage_model or "", EXTRACTION_INSTRUCTIONS,
+                section['title'], section['content']
+            )
+            cached = section_cache.get(cache_keys[i])
+            if cached is not None:
+                analysis = copy.deepcopy(cached)
+                results[i] = analysis
+                cached_count += 1
+                if on_result is not None:
+                    on_result(i, analysis)
+                continue
+        to_extract.append(i)
+    
+    if verbose and len(to_extract) < len(sections):
+        print(f"   ⏭️ {len(sections) - len(seen_content) - len(duplicates)} skipped, "
+              f"♻️ {len(duplicates)} duplicate(s), 💾 {cached_count} cached\n")
+    
+    if to_extract:
+        extracted = run_coroutine(_process_sections_async(
+            sections, to_extract, model, triage_model, concurrency, batch_size, verbose,
+            on_result
+        ))
+        for i, analysis in extracted.items():
+            results[i] = analysis
+            if section_cache is not None and "error" not in analysis:
+                section_cache.set(cache_keys[i], copy.deepcopy(analysis))
+        if section_cache is not None:
+            section_cache.flush()
+    
+    for i, duplicate_of in duplicates.items():
+        analysis = copy.deepcopy(results[duplicate_of])
+        analysis["section_title"] = sections[i]["title"]
+        results[i] = analysis
+        if on_result is not None:
+            on_result(i, analysis)
         
     return results
 
 
-def collect_all_regulations(analysis_results: List[Dict]) -> List[Dict]:
+def iter_regulations(analysis_results: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    Yield the regulations of each section analysis one by one.
+    
+    Streaming counterpart of collect_all_regulations (also tags each
+    regulation with its "source_section"); feed it straight into
+    filter_regulations_by_quality when the flat list itself is not needed.
+    
+    Args:
+        analysis_results: Section analysis results
+    
+    Yields:
+        Regulation dicts
+    """
+    for result in analysis_results:
+        if result.get("contains_regulation"):
+            for reg in result.get("regulations") or ():
+                reg["source_section"] = result.get("section_title")
+                yield reg
+
+
+def collect_all_regulations(
+    analysis_results: List[Dict],
+    return_stats: bool = False
+) -> Union[List[Dict], Tuple[List[Dict], int]]:
     """
     Extract all regulations from analysis results into a flat list.
     
     Args:
         analysis_results: List of section analysis results
+        return_stats: Also return the number of sections that contain
+                      regulations (counted in the same pass)
     
     Returns:
-        List of all extracted regulations
+        List of all extracted regulations, or a (regulations,
+        sections_with_regulations) tuple if return_stats is True
     """
     all_regulations = []
+    sections_with_regulations = 0
     
     for result in analysis_results:
-        if result.get("contains_regulation") and result.get("regulations"):
-            for reg in result["regulations"]:
+        if result.get("contains_regulation"):
+            sections_with_regulations += 1
+            for reg in result.get("regulations") or ():
                 reg["source_section"] = result.get("section_title")
                 all_regulations.append(reg)
     
+    if return_stats:
+        return all_regulations, sections_with_regulations
     return all_regulations
 
 
+def _regulation_fingerprint(regulation: Dict) -> bytes:
+    """Hash of the id, name and description start identifying a regulation."""
+    description = regulation.get("description") or ""
+    if not isinstance(description, str):
+        description = json.dumps(description, sort_keys=True, ensure_ascii=False, default=str)
+    key = (
+        regulation.get("regulation_id") or "",
+        regulation.get("regulation_name") or "",
+        description[:200]
+    )
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+
+
+def drop_duplicate_regulations(regulations: List[Dict]) -> List[Dict]:
+    """
+    Remove regulations extracted more than once (e.g. from several sections).
+    
+    Two regulations count as duplicates when their regulation_id,
+    regulation_name and the first 200 characters of their description
+    match; the first occurrence is kept.
+    
+    Args:
+        regulations: List of regulation dicts
+    
+    Returns:
+        List of unique regulations, in their original order
+    """
+    seen = set()
+    unique = []
+    
+    for reg in regulations:
+        fingerprint = _regulation_fingerprint(reg)
+        if fingerprint not in seen:
+            seen.add(fingerprint)
+            unique.append(reg)
+    
+    return unique
+
+
 # ============================================================
 # QUALITY FILTERING
 # ============================================================
 
-def calculate_quality_score(regulation: Dict) -> Dict:
+# Placeholder values the model emits for missing information. Only strings
+# are checked against these (dicts and lists are unhashable); None and ""
+# are already rejected by the truthiness test in front of every check.
+_NULL_SENTINELS = frozenset(("null", "N/A", "Unknown"))
+_NULL_SENTINELS_SOFT = frozenset(("null",))
+
+# Field -> points awarded by calculate_quality_score
+_CRITICAL_FIELDS = {
+    "regulation_id": 10,
+    "regulation_name": 10,
+    "regulation_type": 10,
+    "description": 10
+}
+_IMPORTANT_FIELDS = {
+    "jurisdiction": 6,
+    "domain": 6,
+    "scope": 6,
+    "requirements": 6,
+    "restrictions": 6
+}
+_SUPPLEMENTARY_FIELDS = {
+    "rights_granted": 5,
+    "exceptions": 5,
+    "compliance_requirements": 5,
+    "enforcement": 5,
+    "dates": 5,
+    "keywords": 5
+}
+
+# (field, points, tier) in scoring order, so calculate_quality_score runs
+# a single loop over all tiers
+_FIELD_SPECS = (
+    *((field, points, "critical") for field, points in _CRITICAL_FIELDS.items()),
+    *((field, points, "important") for field, points in _IMPORTANT_FIELDS.items()),
+    *((field, points, "supplementary") for field, points in _SUPPLEMENTARY_FIELDS.items()),
+)
+
+# (minimum score, recommendation, status), checked in order
+_TIERS = (
+    (70, "KEEP", "🟢"),
+    (40, "REVIEW", "🟡"),
+    (float("-inf"), "DISCARD", "🔴"),
+)
+
+
+class QualityScore(TypedDict, total=False):
+    """Schema of the quality dicts stored under a regulation's "_quality_score"."""
+    score: float
+    max_score: int
+    percentage: float
+    recommendation: str
+    status: str
+    issues: List[str]
+    strengths: List[str]
+    early_terminated: bool
+
+
+def _dict_fill_ratio(value: Dict) -> float:
+    """Fraction of a dict's values that are filled in."""
+    non_null = sum(1 for v in value.values() if v and not (isinstance(v, str) and v in _NULL_SENTINELS_SOFT))
+    return non_null / max(len(value), 1)
+
+
+def _early_discard_result(score: float, issues: List[str], strengths: List[str]) -> QualityScore:
+    """Result for a regulation that can no longer reach the requested score."""
+    rounded = round(score, 1)
+    return {
+        "score": rounded,
+        "max_score": 100,
+        "percentage": rounded,
+        "recommendation": "DISCARD",
+        "status": "🔴",
+        "issues": issues,
+        "strengths": strengths,
+        "early_terminated": True
+    }
+
+
+def calculate_quality_score(
+    regulation: Dict,
+    early_terminate_below: Optional[float] = None,
+    collect_diagnostics: bool = True
+) -> QualityScore:
     """
     Calculate a quality score for a regulation based on completeness.
     
     Args:
         regulation: Regulation dict
+        early_terminate_below: Stop scoring as soon as the score can no
+                               longer reach this value and return a
+                               DISCARD result; its score, issues and
+                               strengths then only cover the fields
+                               checked so far ("early_terminated": True)
+        collect_diagnostics: Build the issue/strength messages (left empty
+                             when False)
     
     Returns:
         Dict with score, issues, and recommendation
@@ -404,80 +1067,38 @@ def calculate_quality_score(regulation: Dict) -> Dict:
     score = 0
     issues = []
     strengths = []
+    # Points still obtainable from the fields not checked yet
+    remaining = 100
+    get = regulation.get
     
-    # Critical fields (40 points)
-    critical_fields = {
-        "regulation_id": 10,
-        "regulation_name": 10,
-        "regulation_type": 10,
-        "description": 10
-    }
-    
-    for field, points in critical_fields.items():
-        value = regulation.get(field)
-        if value and value not in [None, "null", "", "N/A", "Unknown"]:
-            if isinstance(value, dict):
-                non_null = sum(1 for v in value.values() if v and v not in [None, "null", ""])
-                score += points * (non_null / max(len(value), 1))
-                strengths.append(f"✓ Has {field}")
+    # Critical (40 points), important (30 points), supplementary (30 points)
+    for field, points, tier in _FIELD_SPECS:
+        value = get(field)
+        sentinels = _NULL_SENTINELS if tier == "critical" else _NULL_SENTINELS_SOFT
+        if value and not (isinstance(value, str) and value in sentinels):
+            if tier != "supplementary" and isinstance(value, dict):
+                score += points * _dict_fill_ratio(value)
             else:
                 score += points
+            if collect_diagnostics and tier == "critical":
                 strengths.append(f"✓ Has {field}")
-        else:
-            issues.append(f"✗ Missing: {field}")
-    
-    # Important fields (30 points)
-    important_fields = {
-        "jurisdiction": 6,
-        "domain": 6,
-        "scope": 6,
-        "requirements": 6,
-        "restrictions": 6
-    }
-    
-    for field, points in important_fields.items():
-        value = regulation.get(field)
-        if value and value not in [None, "null", ""]:
-            if isinstance(value, dict):
-                non_null = sum(1 for v in value.values() if v and v not in [None, "null", ""])
-                score += points * (non_null / max(len(value), 1))
-            elif isinstance(value, list):
-                score += points * (1 if len(value) > 0 else 0)
-            else:
-                score += points
-        else:
-            issues.append(f"⚠ Missing: {field}")
-    
-    # Supplementary fields (30 points)
-    supplementary_fields = {
-        "rights_granted": 5,
-        "exceptions": 5,
-        "compliance_requirements": 5,
-        "enforcement": 5,
-        "dates": 5,
-        "keywords": 5
-    }
-    
-    for field, points in supplementary_fields.items():
-        value = regulation.get(field)
-        if value and value not in [None, "null", ""]:
-            score += points
+        elif collect_diagnostics and tier != "supplementary":
+            issues.append(f"✗ Missing: {field}" if tier == "critical" else f"⚠ Missing: {field}")
+        
+        remaining -= points
+        if early_terminate_below is not None and round(score + remaining, 1) < early_terminate_below:
+            return _early_discard_result(score, issues, strengths)
     
     # Determine recommendation
-    if score >= 70:
-        recommendation = "KEEP"
-        status = "🟢"
-    elif score >= 40:
-        recommendation = "REVIEW"
-        status = "🟡"
-    else:
-        recommendation = "DISCARD"
-        status = "🔴"
+    for threshold, recommendation, status in _TIERS:
+        if score >= threshold:
+            break
     
+    rounded = round(score, 1)
     return {
-        "score": round(score, 1),
+        "score": rounded,
         "max_score": 100,
-        "percentage": round(score, 1),
+        "percentage": rounded,
         "recommendation": recommendation,
         "status": status,
         "issues": issues,
@@ -486,61 +1107,88 @@ def calculate_quality_score(regulation: Dict) -> Dict:
 
 
 def filter_regulations_by_quality(
-    regulations: List[Dict],
+    regulations: Iterable[Dict],
     min_score: float = 40,
-    verbose: bool = True
+    verbose: bool = True,
+    collect_diagnostics: bool = True
 ) -> Dict:
     """
     Filter regulations based on quality score.
     
     Args:
-        regulations: List of regulation dicts
+        regulations: Regulation dicts (a list, or any iterable such as
+                     iter_regulations(); it is consumed in one pass)
         min_score: Minimum score to keep (0-100)
         verbose: Whether to print details
+        collect_diagnostics: Record issue/strength messages in each
+                             "_quality_score" (False to only score)
+    
+    Scoring of a regulation stops as soon as it cannot reach the lower of
+    `min_score` and 70 (scores of 70+ are kept whatever `min_score` is).
+    Such a regulation is then scored in full, so the "_quality_score"
+    saved with it is the same as without early termination.
     
     Returns:
-        Dict with kept, review, and discarded lists
+        Dict with kept, review, and discarded lists, plus the positions of
+        their regulations in `regulations` (kept_idx, review_idx,
+        discarded_idx)
     """
-    kept = []
-    review = []
-    discarded = []
+    kept, kept_idx = [], []
+    review, review_idx = [], []
+    discarded, discarded_idx = [], []
+    total = 0
     
     if verbose:
-        print(f"\n{'='*60}")
-        print(f"🔍 RPEM: Quality Filtering")
-        print(f"{'='*60}")
-        print(f"   Minimum score: {min_score}")
-        print(f"   Regulations to analyze: {len(regulations)}\n")
+        count = len(regulations) if isinstance(regulations, (list, tuple)) else "streamed"
+        print(f"\n{'='*60}\n"
+              f"🔍 RPEM: Quality Filtering\n"
+              f"{'='*60}\n"
+              f"   Minimum score: {min_score}\n"
+              f"   Regulations to analyze: {count}\n")
     
-    for reg in regulations:
-        quality = calculate_quality_score(reg)
+    # Below this bound a regulation is discarded, so scoring can stop early
+    discard_below = min(min_score, 70)
+    
+    for i, reg in enumerate(regulations):
+        total += 1
+        quality = calculate_quality_score(reg, discard_below, collect_diagnostics)
+        if quality.get("early_terminated"):
+            # Known to be discarded; store its full score, not the partial one
+            quality = calculate_quality_score(reg, collect_diagnostics=collect_diagnostics)
         reg["_quality_score"] = quality
         
         if quality["score"] >= 70:
             kept.append(reg)
+            kept_idx.append(i)
         elif quality["score"] >= min_score:
             review.append(reg)
+            review_idx.append(i)
         else:
             discarded.append(reg)
+            discarded_idx.append(i)
     
     if verbose:
-        print(f"{'='*60}")
-        print(f"📊 FILTERING RESULTS")
-        print(f"{'='*60}")
-        print(f"   🟢 KEPT (score ≥ 70):      {len(kept):3d}")
-        print(f"   🟡 REVIEW (score ≥ {min_score}):    {len(review):3d}")
-        print(f"   🔴 DISCARDED (score < {min_score}): {len(discarded):3d}")
-        print(f"{'='*60}")
+        print(f"{'='*60}\n"
+              f"📊 FILTERING RESULTS\n"
+              f"{'='*60}\n"
+              f"   🟢 KEPT (score ≥ 70):      {len(kept):3d}\n"
+              f"   🟡 REVIEW (score ≥ {min_score}):    {len(review):3d}\n"
+              f"   🔴 DISCARDED (score < {min_score}): {len(discarded):3d}\n"
+              f"{'='*60}")
     
     return {
         "kept": kept,
         "review": review,
         "discarded": discarded,
+        "kept_idx": kept_idx,
+        "review_idx": review_idx,
+        "discarded_idx": discarded_idx,
         "statistics": {
-            "total": len(regulations),
+            "total": total,
             "kept_count": len(kept),
             "review_count": len(review),
-            "discarded_count": len(discarded)
+            "discarded_count": len(discarded),
+            "after_filtering": len(kept) + len(review)
         }
     }
 
@@ -554,7 +1202,10 @@ def process_regulation_document(
     output_path: Optional[str] = None,
     model: str = "gpt-4.1",
     min_quality_score: float = 40,
-    verbose: bool = True
+    verbose: bool = True,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    use_cache: bool = False,
+    pretty: bool = False
 ) -> Dict:
     """
     Complete pipeline to process a regulation document.
@@ -565,14 +1216,18 @@ def process_regulation_document(
         model: OpenAI model to use
         min_quality_score: Minimum quality score for filtering
         verbose: Whether to print progress
+        concurrency: Maximum number of simultaneous extraction requests
+        use_cache: Reuse section extractions cached in RPEM_SECTION_CACHE
+                   by earlier runs
+        pretty: Indent the saved JSON (compact by default)
     
     Returns:
         Dict with all processing results
     """
     if verbose:
-        print(f"\n{'='*70}")
-        print(f"🔍 ARCCS - RPEM: Regulatory Processing and Extraction Module")
-        print(f"{'='*70}\n")
+        print(f"\n{'='*70}\n"
+              f"🔍 ARCCS - RPEM: Regulatory Processing and Extraction Module\n"
+              f"{'='*70}\n")
     
     # Step 1: Load and parse PDF
     elements = load_pdf_document(pdf_path)
@@ -583,13 +1238,20 @@ def process_regulation_document(
         print(f"📑 Split into {len(sections)} sections\n")
     
     # Step 2: Extract regulations from each section
-    analysis_results = process_all_sections(sections, model, verbose)
+    analysis_results = process_all_sections(
+        sections, model, verbose,
+        concurrency=concurrency,
+        section_cache=RPEM_SECTION_CACHE if use_cache else None
+    )
     
     # Step 3: Collect all regulations
-    all_regulations = collect_all_regulations(analysis_results)
+    all_regulations, sections_with_regulations = collect_all_regulations(analysis_results, return_stats=True)
+    total_extracted = len(all_regulations)
+    all_regulations = drop_duplicate_regulations(all_regulations)
     
     if verbose:
-        print(f"\n📋 Total regulations extracted: {len(all_regulations)}")
+        print(f"\n📋 Total regulations extracted: {total_extracted} "
+              f"({total_extracted - len(all_regulations)} exact duplicate(s) dropped)")
     
     # Step 4: Filter by quality
     filtered = filter_regulations_by_quality(all_regulations, min_quality_score, verbose)
@@ -599,9 +1261,10 @@ def process_regulation_document(
         "document_analysis": {
             "source_file": pdf_path,
             "total_sections": len(sections),
-            "sections_with_regulations": sum(1 for r in analysis_results if r.get("contains_regulation")),
-            "total_regulations_extracted": len(all_regulations),
-            "regulations_after_filtering": len(filtered["kept"]) + len(filtered["review"])
+            "sections_with_regulations": sections_with_regulations,
+            "total_regulations_extracted": total_extracted,
+            "duplicates_removed": total_extracted - len(all_regulations),
+            "regulations_after_filtering": filtered["statistics"]["after_filtering"]
         },
         "section_analyses": analysis_results,
         "all_regulations": all_regulations,
@@ -612,8 +1275,9 @@ def process_regulation_document(
     
     # Save if path provided
     if output_path:
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        with open(output_path, "wb") as f:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+            f.write(orjson.dumps(output, option=option))
         if verbose:
             print(f"\n💾 Results saved to '{output_path}'")
     
@@ -638,6 +1302,7 @@ def print_module_info():
 ║                                                                   ║
 ║  Functions:                                                       ║
 ║    • load_pdf_document()      - Load and parse PDF files          ║
+║    • load_pdf_documents()     - Parse several PDFs in parallel    ║
 ║    • elements_to_markdown()   - Convert to markdown format        ║
 ║    • split_into_sections()    - Split by headers                  ║
 ║    • extract_regulations_from_section() - AI extraction           ║
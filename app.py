@@ -1,15 +1,35 @@
-from flask import Flask, render_template, request, jsonify, Response
+from flask import Flask, render_template, request, jsonify, Response, g, make_response, copy_current_request_context
 import os
-import json
+import copy
+import orjson
+import hashlib
+import tempfile
 import queue
+import functools
+import sys
+import atexit
+import logging
+import logging.handlers
 import threading
+import time
+import uuid
+from urllib.parse import unquote
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime
+from flask.json.provider import JSONProvider
 from werkzeug.utils import secure_filename
 import openai
 
+from llm_cache import ResponseCache
+
 # Settings file path
 SETTINGS_FILE = os.path.join(os.path.dirname(__file__), 'settings.json')
-HISTORY_FILE = os.path.join(os.path.dirname(__file__), 'history.json')
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), 'history.jsonl')
+LEGACY_HISTORY_FILE = os.path.join(os.path.dirname(__file__), 'history.json')
+MAX_HISTORY = 50
+# Appends grow history.jsonl; it is trimmed to MAX_HISTORY entries past this size
+HISTORY_COMPACT_BYTES = 16 * 1024 * 1024
 
 # Default settings
 DEFAULT_SETTINGS = {
@@ -17,117 +37,510 @@ DEFAULT_SETTINGS = {
     'model': 'gpt-5.2',
     'auto_save_reports': True,
     'max_regulations_to_check': 10,
-    'quality_threshold': 40
+    'quality_threshold': 40,
+    'api_concurrency': 8,
+    'ccm_concurrency': 16,
+    'relevant_passages': 0
 }
 
+# Parsed settings.json, reused until the file's mtime changes
+_settings_cache = {'mtime': None, 'data': None}
+_settings_lock = threading.Lock()
+
+def _settings_mtime():
+    try:
+        return os.stat(SETTINGS_FILE).st_mtime_ns
+    except OSError:
+        return None
+
 def load_settings():
-    """Load settings from file"""
-    if os.path.exists(SETTINGS_FILE):
+    """Load settings from file (cached until settings.json changes)"""
+    mtime = _settings_mtime()
+    with _settings_lock:
+        if mtime is not None and mtime == _settings_cache['mtime']:
+            return dict(_settings_cache['data'])
+    
+    if mtime is not None:
         try:
-            with open(SETTINGS_FILE, 'r') as f:
-                settings = json.load(f)
+            with open(SETTINGS_FILE, 'rb') as f:
+                settings = orjson.loads(f.read())
                 # Merge with defaults for any missing keys
                 for key, value in DEFAULT_SETTINGS.items():
                     if key not in settings:
                         settings[key] = value
-                return settings
+            with _settings_lock:
+                _settings_cache['mtime'] = mtime
+                _settings_cache['data'] = settings
+            return dict(settings)
         except:
             pass
     return DEFAULT_SETTINGS.copy()
 
 def save_settings(settings):
     """Save settings to file"""
-    with open(SETTINGS_FILE, 'w') as f:
-        json.dump(settings, f, indent=2)
+    with open(SETTINGS_FILE, 'wb') as f:
+        f.write(orjson.dumps(settings, option=orjson.OPT_INDENT_2))
+    with _settings_lock:
+        _settings_cache['mtime'] = _settings_mtime()
+        _settings_cache['data'] = dict(settings)
+
+# history.jsonl holds one entry per line, oldest first, so adding an entry is an append
+_history_lock = threading.Lock()
+
+def _dump_history_entry(entry):
+    return orjson.dumps(entry, option=orjson.OPT_NON_STR_KEYS, default=str) + b'\n'
+
+def _read_tail_lines(path, n, block_size=64 * 1024):
+    """Return the last n non-empty lines of a file, reading backwards in blocks"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= n:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    return [line for line in data.splitlines() if line.strip()][-n:]
+
+def _migrate_legacy_history():
+    """Convert the old history.json (a JSON array, newest first) to history.jsonl"""
+    if os.path.exists(HISTORY_FILE) or not os.path.exists(LEGACY_HISTORY_FILE):
+        return
+    try:
+        with open(LEGACY_HISTORY_FILE, 'rb') as f:
+            legacy = orjson.loads(f.read())
+        save_history(legacy)
+    except Exception as e:
+        print (e)
+
+# Last result of load_history, reused until history.jsonl changes
+_history_cache = {'stamp': None, 'list': [], 'by_id': {}}
+
+def _cached_history():
+    """The history cache, refreshed from file if history.jsonl changed"""
+    try:
+        st = os.stat(HISTORY_FILE)
+    except OSError:
+        return {'stamp': None, 'list': [], 'by_id': {}}
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _history_lock:
+        if _history_cache['stamp'] == stamp:
+            return dict(_history_cache)
+    
+    try:
+        lines = _read_tail_lines(HISTORY_FILE, MAX_HISTORY)
+        history = [orjson.loads(line) for line in reversed(lines)]
+    except:
+        return {'stamp': None, 'list': [], 'by_id': {}}
+    with _history_lock:
+        _history_cache['stamp'] = stamp
+        _history_cache['list'] = history
+        _history_cache['by_id'] = {item.get('id'): item for item in history}
+        return dict(_history_cache)
 
 def load_history():
-    """Load history from file"""
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    return []
+    """Load the last MAX_HISTORY entries from file, newest first (shared; do not mutate)"""
+    return _cached_history()['list']
+
+def get_history_entry(history_id):
+    """Look up a history entry by id, or None"""
+    return _cached_history()['by_id'].get(history_id)
 
 def save_history(history):
-    """Save history to file"""
-    with open(HISTORY_FILE, 'w') as f:
-        json.dump(history, f, indent=2, default=str)
+    """Rewrite the history file from a newest-first list of entries"""
+    with _history_lock:
+        with open(HISTORY_FILE, 'wb') as f:
+            f.writelines(_dump_history_entry(entry) for entry in reversed(history))
 
 def add_to_history(entry):
     """Add an entry to history"""
-    history = load_history()
-    entry['id'] = len(history) + 1
-    entry['timestamp'] = datetime.now().isoformat()
-    history.insert(0, entry)  # Add to beginning
-    # Keep only last 50 entries
-    history = history[:50]
-    save_history(history)
+    with _history_lock:
+        last = _read_tail_lines(HISTORY_FILE, 1) if os.path.exists(HISTORY_FILE) else []
+        entry['id'] = orjson.loads(last[0]).get('id', 0) + 1 if last else 1
+        entry['timestamp'] = datetime.now().isoformat()
+        with open(HISTORY_FILE, 'ab') as f:
+            f.write(_dump_history_entry(entry))
+        oversized = os.path.getsize(HISTORY_FILE) > HISTORY_COMPACT_BYTES
+    
+    if oversized:
+        # Keep only the last MAX_HISTORY entries
+        save_history(load_history())
     return entry
 
 # Load settings on startup
 current_settings = load_settings()
+_migrate_legacy_history()
 
 # Set OpenAI API key from settings
 openai.api_key = current_settings.get('api_key', 'your-api-key-here')
 
-# Import RPEM and CCM modules
-from RPEM import (
-    load_pdf_document,
-    elements_to_markdown,
-    split_into_sections,
-    process_all_sections,
-    collect_all_regulations,
-    filter_regulations_by_quality,
-)
-from CCM import (
-    check_regulation_compliance,
-    check_all_regulations,
-    generate_compliance_report
-)
+# RPEM and CCM are imported on first use: RPEM pulls in the unstructured
+# PDF stack, which would otherwise slow down every app start
+@functools.cache
+def _rpem():
+    import RPEM
+    return RPEM
+
+@functools.cache
+def _ccm():
+    import CCM
+    return CCM
+
+class OrjsonProvider(JSONProvider):
+    """Serve jsonify() responses and request.json through orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, default=str).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of
+        # decoding to str in dumps() only for Flask to encode it again
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, default=str)
+        return self._app.response_class(body, mimetype='application/json')
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 32 * 1024 * 1024  # 32MB max file size
 
 # Ensure upload folder exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+CACHE_FOLDER = os.path.join(app.config['UPLOAD_FOLDER'], '.cache')
+os.makedirs(CACHE_FOLDER, exist_ok=True)
+
+# Regulations extracted from a PDF, keyed by the file's SHA-256 and the model
+PIPELINE_CACHE = ResponseCache(os.path.join(CACHE_FOLDER, 'pipeline'))
 
 # Allowed file extensions
-ALLOWED_EXTENSIONS = {'pdf', 'txt', 'json'}
+ALLOWED_EXTENSIONS = frozenset({'pdf', 'txt', 'json'})
 
 def get_current_model():
     """Get current model from settings"""
     settings = load_settings()
     return settings.get('model', 'gpt-4')
 
-# Global message queue for SSE streaming
-log_queues = {}
+# Console logging goes through a queue drained by one background listener,
+# so request threads never block on stdout
+LOG_LEVELS = {
+    'info': logging.INFO,
+    'success': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR
+}
+
+logger = logging.getLogger('arccs')
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_console_log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_console_log_queue))
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(logging.Formatter('%(message)s'))
+log_listener = logging.handlers.QueueListener(_console_log_queue, _console_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
 
-def get_log_queue(session_id='default'):
-    """Get or create a log queue for a session"""
-    if session_id not in log_queues:
-        log_queues[session_id] = queue.Queue()
-    return log_queues[session_id]
+# One queue per open SSE stream; send_log fans each message out to all of them
+log_subscribers = {}
+log_subscribers_lock = threading.Lock()
+
+# Sentinel queued to every open stream by a single background thread, so idle
+# streams block without polling but disconnected clients are still noticed
+SSE_PING = object()
+SSE_PING_INTERVAL = 30
+
+# Messages arriving within SSE_BATCH_WINDOW of each other are sent as one event
+SSE_BATCH_WINDOW = 0.05
+SSE_BATCH_SIZE = 100
+
+# Most messages held for a single stream before the oldest are dropped
+SSE_QUEUE_SIZE = 1024
+_ping_thread = None
+
+def _ping_subscribers():
+    while True:
+        time.sleep(SSE_PING_INTERVAL)
+        with log_subscribers_lock:
+            subscribers = [q for queues in log_subscribers.values() for q in queues]
+        for q in subscribers:
+            # A stream with messages pending gets written to anyway
+            if q.qsize() == 0:
+                q.put(SSE_PING)
+
+def subscribe_logs(session_id='default'):
+    """Register a new SSE stream for a session and return its queue"""
+    global _ping_thread
+    # SimpleQueue: unbounded and thread-safe; only put/get are needed here
+    q = queue.SimpleQueue()
+    with log_subscribers_lock:
+        log_subscribers.setdefault(session_id, set()).add(q)
+        if _ping_thread is None:
+            _ping_thread = threading.Thread(target=_ping_subscribers, daemon=True)
+            _ping_thread.start()
+    return q
+
+def unsubscribe_logs(q, session_id='default'):
+    """Remove a closed SSE stream's queue"""
+    with log_subscribers_lock:
+        subscribers = log_subscribers.get(session_id)
+        if subscribers is not None:
+            subscribers.discard(q)
+            if not subscribers:
+                del log_subscribers[session_id]
 
 def send_log(message, log_type='info', session_id='default'):
     """Send a log message to the frontend via SSE"""
-    q = get_log_queue(session_id)
-    q.put({'type': log_type, 'message': message})
-    # Also print to console
-    print(message)
+    msg = {'type': log_type, 'message': message}
+    with log_subscribers_lock:
+        subscribers = list(log_subscribers.get(session_id, ()))
+    for q in subscribers:
+        # Drop the oldest message when a stream falls too far behind
+        if q.qsize() >= SSE_QUEUE_SIZE:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+        q.put_nowait(msg)
+    # Also log to console
+    logger.log(LOG_LEVELS.get(log_type, logging.INFO), message)
+
+def file_extension(filename):
+    """Lower-cased extension without the dot ('' if there is none)"""
+    return os.path.splitext(filename)[1].lower().lstrip('.')
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-# Global state to store processed data between requests
-app_state = {
-    'regulation_file': None,
-    'proposal_file': None,
-    'extracted_regulations': [],
-    'proposal_text': None
+    return file_extension(filename) in ALLOWED_EXTENSIONS
+
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+def receive_upload(prefix):
+    """
+    Write the uploaded file to the upload folder in UPLOAD_CHUNK_SIZE chunks.
+    
+    Accepts a raw request body (application/octet-stream, original name in the
+    URL-encoded X-Filename header) or a multipart form with a 'file' field.
+    
+    Returns:
+        (filepath, extension, original filename, None) on success,
+        (None, None, None, error response) otherwise
+    """
+    if request.mimetype == 'application/octet-stream':
+        original_name = unquote(request.headers.get('X-Filename', ''))
+        stream = request.stream
+    else:
+        if 'file' not in request.files:
+            return None, None, None, (jsonify({'success': False, 'message': 'No file provided'}), 400)
+        file = request.files['file']
+        original_name = file.filename
+        stream = file.stream
+    
+    if original_name == '':
+        return None, None, None, (jsonify({'success': False, 'message': 'No file selected'}), 400)
+    
+    file_ext = file_extension(original_name)
+    if file_ext not in ALLOWED_EXTENSIONS:
+        return None, None, None, (jsonify({'success': False, 'message': 'File type not allowed. Use PDF, TXT, or JSON.'}), 400)
+    
+    filename = secure_filename(original_name)
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], prefix + filename)
+    with open(filepath, 'wb') as f:
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            f.write(chunk)
+    
+    return filepath, file_ext, original_name, None
+
+# Parsed regulation JSON files, keyed by path and invalidated when the file changes
+_regulations_json_cache = {}
+_regulations_json_lock = threading.Lock()
+MAX_CACHED_JSON_FILES = 8
+
+def load_json_cached(path):
+    """Parse a JSON file, reusing the previous result while its mtime and size are unchanged"""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _regulations_json_lock:
+        cached = _regulations_json_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    
+    with open(path, 'rb') as f:
+        data = orjson.loads(f.read())
+    
+    with _regulations_json_lock:
+        _regulations_json_cache.pop(path, None)
+        _regulations_json_cache[path] = (stamp, data)
+        while len(_regulations_json_cache) > MAX_CACHED_JSON_FILES:
+            del _regulations_json_cache[next(iter(_regulations_json_cache))]
+    return data
+
+def read_text(filepath):
+    """Read a UTF-8 text file with one sized binary read and a single decode"""
+    with open(filepath, 'rb') as f:
+        return f.read().decode('utf-8', 'replace')
+
+def file_sha256(filepath):
+    """Hex SHA-256 of a file's contents, read in UPLOAD_CHUNK_SIZE blocks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _pdf_cache_path(file_hash):
+    """Cache file for a PDF's parsed markdown, keyed by the SHA-256 of its bytes"""
+    return os.path.join(CACHE_FOLDER, file_hash[:16] + '.json')
+
+def load_pdf_markdown(filepath, file_hash=None):
+    """
+    Parse a PDF into markdown and sections, reusing a previous parse of the same file.
+    
+    Args:
+        filepath: Path to the PDF
+        file_hash: file_sha256(filepath), if the caller already computed it
+    
+    Returns:
+        (markdown_text, sections)
+    """
+    cache_path = _pdf_cache_path(file_hash or file_sha256(filepath))
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = orjson.loads(f.read())
+            return cached['markdown'], cached['sections']
+        except Exception as e:
+            print (e)
+    
+    rpem = _rpem()
+    elements = rpem.load_pdf_document(filepath, strategy="fast")
+    markdown_text = rpem.elements_to_markdown(elements)
+    sections = rpem.split_into_sections(markdown_text)
+    
+    # Write to a temp file and rename, so readers never see a partial cache entry
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(orjson.dumps({'markdown': markdown_text, 'sections': sections}))
+    os.replace(tmp_path, cache_path)
+    
+    return markdown_text, sections
+
+# Idle time (seconds) after which a session's state is discarded
+SESSION_TTL = 6 * 60 * 60
+
+def _new_session_state():
+    return {
+        'lock': threading.RLock(),
+        'regulation_file': None,
+        'regulation_ext': None,
+        'proposal_file': None,
+        'proposal_ext': None,
+        'extracted_regulations': [],
+        'regulations_summary': None,
+        'proposal_text': None,
+        'last_results': None,
+        'last_report': None,
+        'last_report_ts': None
+    }
+
+class SessionStore:
+    """
+    Per-session state (uploaded files, regulations, proposal) shared between requests.
+    
+    Sessions not accessed for `ttl` seconds are dropped, so the regulation
+    lists of abandoned browser sessions do not accumulate in memory.
+    """
+    
+    def __init__(self, ttl=SESSION_TTL):
+        self.ttl = ttl
+        self._sessions = {}
+        self._last_access = {}
+        self._lock = threading.RLock()
+    
+    def get(self, sid):
+        """Get or create the state dict of a session; hold its 'lock' while mutating it"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            if sid not in self._sessions:
+                self._sessions[sid] = _new_session_state()
+            # Re-insert so _last_access stays ordered from least to most recent
+            self._last_access.pop(sid, None)
+            self._last_access[sid] = now
+            return self._sessions[sid]
+    
+    def _evict_idle(self, now):
+        for sid, last in list(self._last_access.items()):
+            if now - last < self.ttl:
+                break
+            del self._last_access[sid]
+            del self._sessions[sid]
+    
+    def reset(self, sid):
+        """Drop the state of a single session"""
+        with self._lock:
+            self._sessions.pop(sid, None)
+            self._last_access.pop(sid, None)
+
+SESSIONS = SessionStore()
+
+@app.before_request
+def assign_session_id():
+    g.sid = request.cookies.get('sid') or uuid.uuid4().hex
+
+@app.after_request
+def set_session_cookie(response):
+    if request.cookies.get('sid') != g.get('sid'):
+        response.set_cookie('sid', g.sid, httponly=True, samesite='Lax')
+    return response
+
+def get_session_state():
+    """State of the session making the current request"""
+    return SESSIONS.get(g.get('sid') or 'default')
+
+# Log line template, log type and detail field for each compliance status
+STATUS_LOG = {
+    'NON_COMPLIANT': ("   ❌ NON_COMPLIANT - Contradiction found!", 'error', 'contradiction_details'),
+    'INSUFFICIENT_INFORMATION': ("   ⚠️ INSUFFICIENT_INFORMATION - Missing data", 'warning', 'missing_information'),
+    'HUMAN_REQUIRED': ("   🔍 HUMAN_REQUIRED - Low confidence ({confidence:.0%})", 'warning', None),
 }
+COMPLIANT_LOG = ("   ✅ COMPLIANT", 'success', None)
+
+def summarize_regulations(regulations):
+    """Unique primary domains and keywords (first 10 per regulation), in first-seen order"""
+    domains = {}
+    keywords = {}
+    for r in regulations:
+        d = r.get('domain')
+        if isinstance(d, dict):
+            primary = d.get('primary_domain')
+            if primary:
+                domains[primary] = None
+        k = r.get('keywords')
+        if k:
+            keywords.update(dict.fromkeys(islice(k, 10)))
+    return {'domains': list(domains), 'keywords': list(keywords), 'total': len(regulations)}
+
+def clear_last_report(store):
+    """Forget a session's last compliance check; call with store['lock'] held"""
+    store['last_results'] = None
+    store['last_report'] = None
+    store['last_report_ts'] = None
+
+def set_extracted_regulations(store, regulations):
+    """Store a session's regulations along with their summary; returns the summary"""
+    summary = summarize_regulations(regulations)
+    with store['lock']:
+        store['extracted_regulations'] = regulations
+        store['regulations_summary'] = summary
+        clear_last_report(store)
+    return summary
 
 @app.route('/')
 def index():
@@ -136,17 +549,33 @@ def index():
 @app.route('/stream-logs')
 def stream_logs():
     """SSE endpoint to stream logs to the frontend"""
+    q = subscribe_logs('default')
+    
     def generate():
-        q = get_log_queue('default')
-        while True:
-            try:
-                # Wait for a message with timeout
-                msg = q.get(timeout=30)
-                data = json.dumps(msg)
-                yield f"data: {data}\n\n"
-            except queue.Empty:
-                # Send keepalive
-                yield f"data: {json.dumps({'type': 'keepalive', 'message': ''})}\n\n"
+        try:
+            while True:
+                msg = q.get()
+                if msg is SSE_PING:
+                    # SSE comment: keeps proxies from timing out, ignored by EventSource
+                    yield b": ping\n\n"
+                    continue
+                
+                batch = [msg]
+                deadline = time.monotonic() + SSE_BATCH_WINDOW
+                while len(batch) < SSE_BATCH_SIZE:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        msg = q.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if msg is not SSE_PING:
+                        batch.append(msg)
+                yield b"data: " + orjson.dumps({'batch': batch}) + b"\n\n"
+        finally:
+            # Runs when the client disconnects and the server closes the generator
+            unsubscribe_logs(q, 'default')
     
     return Response(generate(), mimetype='text/event-stream',
                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -154,75 +583,148 @@ def stream_logs():
 @app.route('/upload-regulation', methods=['POST'])
 def upload_regulation():
     """Handle regulation/compliance document upload"""
-    if 'file' not in request.files:
-        return jsonify({'success': False, 'message': 'No file provided'}), 400
-    
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'success': False, 'message': 'No file selected'}), 400
+    filepath, file_ext, original_name, error = receive_upload('regulation_')
+    if error:
+        return error
     
-    if not allowed_file(file.filename):
-        return jsonify({'success': False, 'message': 'File type not allowed. Use PDF, TXT, or JSON.'}), 400
-    
-    # Save file
-    filename = secure_filename(file.filename)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], 'regulation_' + filename)
-    file.save(filepath)
-    
-    app_state['regulation_file'] = filepath
+    store = get_session_state()
+    with store['lock']:
+        store['regulation_file'] = filepath
+        store['regulation_ext'] = file_ext
     
     return jsonify({
         'success': True,
         'message': 'Regulation document uploaded successfully',
-        'filename': file.filename
+        'filename': original_name
     })
 
+# Long-running processing runs on a small pool; the browser polls /job-status
+_job_pool = ThreadPoolExecutor(max_workers=2)
+# Finished jobs whose result is not collected within this time (seconds) are dropped
+JOB_TTL = 60 * 60
+# Unfinished jobs a session may have at once, so one session cannot fill the pool's queue
+MAX_JOBS_PER_SESSION = 2
+# job id -> {'sid', 'future', 'done_at'}
+JOBS = {}
+JOBS_LOCK = threading.Lock()
+
+def _evict_finished_jobs(now):
+    """Drop jobs that finished more than JOB_TTL ago; call with JOBS_LOCK held"""
+    for job_id, job in list(JOBS.items()):
+        if job['done_at'] is None:
+            if job['future'].done():
+                job['done_at'] = now
+        elif now - job['done_at'] >= JOB_TTL:
+            del JOBS[job_id]
+
+def start_job(view):
+    """Run a view function on the job pool and return a 202 response with its job id"""
+    sid = g.sid
+    
+    @copy_current_request_context
+    def run():
+        g.sid = sid
+        return view()
+    
+    job_id = uuid.uuid4().hex
+    with JOBS_LOCK:
+        _evict_finished_jobs(time.monotonic())
+        running = sum(1 for job in JOBS.values() if job['sid'] == sid and job['done_at'] is None)
+        if running >= MAX_JOBS_PER_SESSION:
+            return jsonify({'success': False, 'message': 'Too many jobs in progress. Please wait for them to finish.'}), 429
+        JOBS[job_id] = {'sid': sid, 'future': _job_pool.submit(run), 'done_at': None}
+    return jsonify({'success': True, 'job_id': job_id}), 202
+
+@app.route('/job-status/<job_id>')
+def job_status(job_id):
+    """Report whether a job has finished and, once it has, the response of its view"""
+    with JOBS_LOCK:
+        _evict_finished_jobs(time.monotonic())
+        job = JOBS.get(job_id)
+        future = job['future'] if job is not None else None
+        if future is not None and future.done():
+            del JOBS[job_id]
+    
+    if future is None:
+        return jsonify({'success': False, 'message': 'Unknown job'}), 404
+    if not future.done():
+        return jsonify({'done': False})
+    
+    response = make_response(future.result())
+    return jsonify({'done': True, 'status_code': response.status_code, 'result': response.get_json()})
+
 @app.route('/process-regulation', methods=['POST'])
 def process_regulation():
+    """Start processing the regulation document in the background"""
+    return start_job(_process_regulation)
+
+def _process_regulation():
     """Process the regulation document using RPEM and extract features"""
     try:
-        filepath = app_state.get('regulation_file')
+        # One settings snapshot for the whole request
+        settings = load_settings()
+        model = settings.get('model', 'gpt-4')
+        store = get_session_state()
+        filepath = store.get('regulation_file')
+        file_ext = store.get('regulation_ext')
         
-        if not filepath or not os.path.exists(filepath):
+        if not filepath or not os.path.isfile(filepath):
             return jsonify({'success': False, 'message': 'No regulation file found. Please upload first.'}), 400
         
-        file_ext = filepath.rsplit('.', 1)[1].lower()
-        
         if file_ext == 'pdf':
             # Use RPEM to process PDF
             send_log("=" * 60)
             send_log(f"🔍 RPEM: Processing PDF: {os.path.basename(filepath)}")
             send_log("=" * 60)
             
+            # Same document and model as an earlier run: reuse its regulations
+            file_hash = file_sha256(filepath)
+            cache_key = PIPELINE_CACHE.make_key('regulation', file_hash, model)
+            # The cache only copies the top-level dict; the regulation lists
+            # would otherwise be shared with (and mutated through) the session
+            cached = copy.deepcopy(PIPELINE_CACHE.get(cache_key))
+            if cached is not None:
+                set_extracted_regulations(store, cached['regulations'])
+                send_log(f"♻️ Reusing {len(cached['regulations'])} regulations extracted earlier from this document", 'success')
+                return jsonify({
+                    'success': True,
+                    'message': 'Processing complete',
+                    'features': cached['features']
+                })
+            
             # Load and parse PDF
             send_log("📄 Loading PDF document...")
-            elements = load_pdf_document(filepath, strategy="fast")
-            markdown_text = elements_to_markdown(elements)
-            sections = split_into_sections(markdown_text)
+            markdown_text, sections = load_pdf_markdown(filepath, file_hash)
             
             send_log(f"📑 Split into {len(sections)} sections", 'success')
             
             # Extract regulations from sections using AI
-            send_log(f"🤖 Extracting regulations with AI (model: {get_current_model()})...")
+            send_log(f"🤖 Extracting regulations with AI (model: {model})...")
             send_log("⏳ This may take several minutes for large documents...", 'warning')
             
-            # Process sections one by one with logging
-            analysis_results = []
-            for i, section in enumerate(sections):
-                section_title = section.get('title', 'Untitled')[:40]
-                send_log(f"📝 [{i+1}/{len(sections)}] Processing: {section_title}...")
-                
-                # Process single section using extract_regulations_from_section
-                from RPEM import extract_regulations_from_section
-                result = extract_regulations_from_section(section, model=get_current_model())
-                analysis_results.append(result)
-                
+            # Sections are extracted concurrently; each one is logged as its
+            # result comes in
+            done = 0
+            
+            def log_section(i, result):
+                nonlocal done
+                done += 1
+                section_title = sections[i].get('title', 'Untitled')[:40]
+                send_log(f"📝 [{done}/{len(sections)}] Processed: {section_title}")
                 if result.get('contains_regulation'):
                     regs_count = len(result.get('regulations', []))
                     send_log(f"   ✅ Found {regs_count} regulation(s)", 'success')
             
+            analysis_results = _rpem().process_all_sections(
+                sections,
+                model=model,
+                verbose=False,
+                concurrency=settings.get('api_concurrency', 8),
+                on_result=log_section
+            )
+            
             # Collect all regulations
-            all_regulations = collect_all_regulations(analysis_results)
+            all_regulations = _rpem().collect_all_regulations(analysis_results)
             
             send_log(f"📋 Total regulations extracted: {len(all_regulations)}", 'info')
             
@@ -238,46 +740,41 @@ def process_regulation():
             
             # Filter by quality
             send_log("🔍 Filtering by quality...")
-            filtered = filter_regulations_by_quality(all_regulations, min_score=40, verbose=False)
+            filtered = _rpem().filter_regulations_by_quality(all_regulations, min_score=40, verbose=False)
             
             # Keep regulations that passed filtering
             kept_regulations = filtered["kept"] + filtered["review"]
-            app_state['extracted_regulations'] = kept_regulations
-            
-            # Collect unique domains and keywords
-            domains = set()
-            keywords = set()
-            for reg in kept_regulations:
-                if reg.get('domain') and isinstance(reg['domain'], dict):
-                    primary = reg['domain'].get('primary_domain')
-                    if primary:
-                        domains.add(primary)
-                if reg.get('keywords'):
-                    keywords.update(reg['keywords'][:10])
+            summary = set_extracted_regulations(store, kept_regulations)
+            domains = summary['domains']
             
             send_log("")
             send_log("✅ Processing complete!", 'success')
             send_log(f"   Regulations kept: {len(kept_regulations)}")
-            send_log(f"   Domains: {list(domains)[:5]}")
+            send_log(f"   Domains: {domains[:5]}")
+            
+            features = {
+                'total_regulations': len(kept_regulations),
+                'categories': domains[:10],
+                'keywords': summary['keywords'][:20],
+                'sections_analyzed': len(sections),
+                'sections_with_regulations': sum(1 for r in analysis_results if r.get("contains_regulation"))
+            }
+            # Runs with failed sections are not cached, so they get retried
+            if not any(r.get('error') for r in analysis_results):
+                PIPELINE_CACHE.set(cache_key, copy.deepcopy({'regulations': kept_regulations, 'features': features}))
+                PIPELINE_CACHE.flush()
             
             return jsonify({
                 'success': True,
                 'message': 'Processing complete',
-                'features': {
-                    'total_regulations': len(kept_regulations),
-                    'categories': list(domains)[:10],
-                    'keywords': list(keywords)[:20],
-                    'sections_analyzed': len(sections),
-                    'sections_with_regulations': sum(1 for r in analysis_results if r.get("contains_regulation"))
-                }
+                'features': features
             })
             
         elif file_ext == 'json':
             # Load regulations from JSON file
             send_log(f"📄 Loading regulations from JSON: {os.path.basename(filepath)}")
             
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json_cached(filepath)
             
             # Handle different JSON structures (from extracted_regulations.json or direct list)
             if isinstance(data, list):
@@ -300,28 +797,18 @@ def process_regulation():
             
             send_log(f"✅ Loaded {len(regulations)} regulations from JSON", 'success')
             
-            app_state['extracted_regulations'] = regulations
-            
-            # Collect domains and keywords
-            domains = set()
-            keywords = set()
-            for reg in regulations:
-                if reg.get('domain') and isinstance(reg['domain'], dict):
-                    primary = reg['domain'].get('primary_domain')
-                    if primary:
-                        domains.add(primary)
-                if reg.get('keywords'):
-                    keywords.update(reg['keywords'][:10])
+            summary = set_extracted_regulations(store, regulations)
+            domains = summary['domains']
             
-            send_log(f"   Domains found: {list(domains)[:5]}")
+            send_log(f"   Domains found: {domains[:5]}")
             
             return jsonify({
                 'success': True,
                 'message': f'Loaded {len(regulations)} regulations from JSON',
                 'features': {
                     'total_regulations': len(regulations),
-                    'categories': list(domains)[:10],
-                    'keywords': list(keywords)[:20],
+                    'categories': domains[:10],
+                    'keywords': summary['keywords'][:20],
                     'sections_analyzed': 1,
                     'sections_with_regulations': 1
                 }
@@ -331,36 +818,26 @@ def process_regulation():
             # For TXT files, treat as a single section
             print(f"\n📄 Processing TXT file as regulation document: {filepath}")
             
-            with open(filepath, 'r', encoding='utf-8') as f:
-                text_content = f.read()
+            text_content = read_text(filepath)
             
             print(f"   Content length: {len(text_content)} characters")
             
             sections = [{'title': '## Document Content', 'content': text_content}]
-            analysis_results = process_all_sections(sections, model=get_current_model(), verbose=True)
-            all_regulations = collect_all_regulations(analysis_results)
+            analysis_results = _rpem().process_all_sections(sections, model=model, verbose=True)
+            all_regulations = _rpem().collect_all_regulations(analysis_results)
             
-            filtered = filter_regulations_by_quality(all_regulations, min_score=40, verbose=True)
+            filtered = _rpem().filter_regulations_by_quality(all_regulations, min_score=40, verbose=True)
             kept_regulations = filtered["kept"] + filtered["review"]
-            app_state['extracted_regulations'] = kept_regulations
-            
-            domains = set()
-            keywords = set()
-            for reg in kept_regulations:
-                if reg.get('domain') and isinstance(reg['domain'], dict):
-                    primary = reg['domain'].get('primary_domain')
-                    if primary:
-                        domains.add(primary)
-                if reg.get('keywords'):
-                    keywords.update(reg['keywords'][:10])
+            summary = set_extracted_regulations(store, kept_regulations)
+            domains = summary['domains']
             
             return jsonify({
                 'success': True,
                 'message': 'Processing complete',
                 'features': {
                     'total_regulations': len(kept_regulations),
-                    'categories': list(domains)[:10],
-                    'keywords': list(keywords)[:20],
+                    'categories': domains[:10],
+                    'keywords': summary['keywords'][:20],
                     'sections_analyzed': 1,
                     'sections_with_regulations': len([r for r in analysis_results if r.get("contains_regulation")])
                 }
@@ -380,59 +857,56 @@ def process_regulation():
 @app.route('/upload-proposal', methods=['POST'])
 def upload_proposal():
     """Handle proposal document upload"""
-    if 'file' not in request.files:
-        return jsonify({'success': False, 'message': 'No file provided'}), 400
+    filepath, file_ext, original_name, error = receive_upload('proposal_')
+    if error:
+        return error
     
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'success': False, 'message': 'No file selected'}), 400
-    
-    if not allowed_file(file.filename):
-        return jsonify({'success': False, 'message': 'File type not allowed. Use PDF, TXT, or JSON.'}), 400
-    
-    # Save file
-    filename = secure_filename(file.filename)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], 'proposal_' + filename)
-    file.save(filepath)
-    
-    app_state['proposal_file'] = filepath
+    store = get_session_state()
+    with store['lock']:
+        store['proposal_file'] = filepath
+        store['proposal_ext'] = file_ext
     
     return jsonify({
         'success': True,
         'message': 'Proposal document uploaded successfully',
-        'filename': file.filename
+        'filename': original_name
     })
 
 @app.route('/process-proposal', methods=['POST'])
 def process_proposal():
+    """Start processing the proposal document in the background"""
+    return start_job(_process_proposal)
+
+def _process_proposal():
     """Process the proposal document - extract text for compliance checking"""
     try:
-        filepath = app_state.get('proposal_file')
+        store = get_session_state()
+        filepath = store.get('proposal_file')
+        file_ext = store.get('proposal_ext')
         
-        if not filepath or not os.path.exists(filepath):
+        if not filepath or not os.path.isfile(filepath):
             return jsonify({'success': False, 'message': 'No proposal file found. Please upload first.'}), 400
         
-        file_ext = filepath.rsplit('.', 1)[1].lower()
-        
         if file_ext == 'pdf':
             # Use RPEM to extract text from PDF
-            elements = load_pdf_document(filepath, strategy="fast")
-            proposal_text = elements_to_markdown(elements)
+            proposal_text, _ = load_pdf_markdown(filepath)
         elif file_ext == 'txt':
-            with open(filepath, 'r', encoding='utf-8') as f:
-                proposal_text = f.read()
+            proposal_text = read_text(filepath)
         elif file_ext == 'json':
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            proposal_text = json.dumps(data, indent=2, ensure_ascii=False)
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read())
+            proposal_text = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
         else:
             return jsonify({'success': False, 'message': 'Unsupported file format'}), 400
         
-        app_state['proposal_text'] = proposal_text
+        with store['lock']:
+            store['proposal_text'] = proposal_text
+            clear_last_report(store)
         
         # Calculate some basic stats
-        lines = proposal_text.split('\n')
-        sections = [l for l in lines if l.startswith('#')]
+        line_count = proposal_text.count('\n') + 1
+        # Markdown heading lines: a '#' at the start of the text or after a newline
+        section_count = proposal_text.count('\n#') + proposal_text.startswith('#')
         words = len(proposal_text.split())
         
         # Estimate complexity based on length
@@ -447,7 +921,7 @@ def process_proposal():
             'success': True,
             'message': 'Proposal processed successfully',
             'data': {
-                'sections': len(sections) if sections else max(1, len(lines) // 50),
+                'sections': section_count or max(1, line_count // 50),
                 'pages': max(1, words // 300),
                 'complexity': complexity,
                 'word_count': words
@@ -467,8 +941,15 @@ def process_proposal():
 def run_compliance_check():
     """Run compliance checking between regulation and proposal using CCM with live streaming"""
     try:
-        regulations = app_state.get('extracted_regulations', [])
-        proposal_text = app_state.get('proposal_text')
+        # One settings snapshot for the whole request
+        settings = load_settings()
+        model = settings.get('model', 'gpt-4')
+        store = get_session_state()
+        with store['lock']:
+            regulations = store.get('extracted_regulations', [])
+            proposal_text = store.get('proposal_text')
+            regulation_file = store.get('regulation_file')
+            proposal_file = store.get('proposal_file')
         
         if not regulations:
             return jsonify({
@@ -487,49 +968,54 @@ def run_compliance_check():
         send_log("=" * 60)
         send_log(f"   Regulations to check: {len(regulations)}")
         send_log(f"   Proposal length: {len(proposal_text):,} characters")
-        send_log(f"   Model: {get_current_model()}")
+        send_log(f"   Model: {model}")
         send_log("=" * 60)
         
         # Limit regulations to check (for performance)
-        max_regulations = load_settings().get('max_regulations_to_check', 10)
+        max_regulations = settings.get('max_regulations_to_check', 10)
         regulations_to_check = regulations[:max_regulations]
         
         if len(regulations) > max_regulations:
             send_log(f"⚠️ Limiting to first {max_regulations} regulations (total: {len(regulations)})", 'warning')
         
-        # Check each regulation individually with streaming
-        results = []
-        for i, reg in enumerate(regulations_to_check):
-            reg_name = reg.get('regulation_name') or 'Unknown'
-            reg_name = reg_name[:55] if reg_name else 'Unknown'
-            send_log(f"⚖️ [{i+1}/{len(regulations_to_check)}] Checking: {reg_name}...")
-            
-            result = check_regulation_compliance(
-                regulation=reg,
-                proposal_chunk=proposal_text,
-                model=get_current_model()
-            )
-            
-            status = result.get('compliance_status', 'UNKNOWN')
-            
-            if status == 'NON_COMPLIANT':
-                send_log(f"   ❌ NON_COMPLIANT - Contradiction found!", 'error')
-                if result.get('contradiction_details'):
-                    send_log(f"      → {result['contradiction_details'][:80]}...", 'error')
-            elif status == 'INSUFFICIENT_INFORMATION':
-                send_log(f"   ⚠️ INSUFFICIENT_INFORMATION - Missing data", 'warning')
-                if result.get('missing_information'):
-                    send_log(f"      → {result['missing_information'][:80]}...", 'warning')
-            elif status == 'HUMAN_REQUIRED':
-                confidence = result.get('confidence_score', 0)
-                send_log(f"   🔍 HUMAN_REQUIRED - Low confidence ({confidence:.0%})", 'warning')
-            else:
-                send_log(f"   ✅ COMPLIANT", 'success')
+        # Check regulations concurrently, streaming each verdict as it arrives
+        done = 0
+        total = len(regulations_to_check)
+        fmt_checked = "⚖️ [{}/{}] Checked: {}".format
+        
+        def log_result(i, reg, result):
+            nonlocal done
+            done += 1
+            reg_name = (reg.get('regulation_name') or 'Unknown')[:55]
+            send_log(fmt_checked(done, total, reg_name))
             
-            results.append(result)
+            template, log_type, detail_key = STATUS_LOG.get(
+                result.get('compliance_status'), COMPLIANT_LOG
+            )
+            send_log(template.format(confidence=result.get('confidence_score', 0)), log_type)
+            if detail_key and result.get(detail_key):
+                send_log(f"      → {result[detail_key][:80]}...", log_type)
+        
+        results = _ccm().check_all_regulations(
+            regulations=regulations_to_check,
+            proposal_chunk=proposal_text,
+            model=model,
+            verbose=False,
+            concurrency=settings.get('ccm_concurrency', 16),
+            on_result=log_result,
+            relevant_passages=settings.get('relevant_passages') or None
+        )
         
         # Generate report
-        report = generate_compliance_report(results)
+        report = _ccm().generate_compliance_report(results)
+        
+        # Keep the report for export, unless the inputs changed while it ran
+        with store['lock']:
+            if (store.get('extracted_regulations') is regulations
+                    and store.get('proposal_text') is proposal_text):
+                store['last_results'] = results
+                store['last_report'] = report
+                store['last_report_ts'] = time.time()
         
         send_log("")
         send_log("✅ Compliance check complete!")
@@ -573,18 +1059,16 @@ def run_compliance_check():
                 'regulation_text': r.get('regulation_text', ''),
                 'keywords': r.get('keywords', []),
                 'obligations': r.get('obligations', []),
-                'source_section': r.get('source_section', ''),
-                'raw_data': r  # Include all raw data
+                'source_section': r.get('source_section', '')
             })
         
         summary = report['summary']
         
         # Save to history if auto-save is enabled
-        settings = load_settings()
         if settings.get('auto_save_reports', True):
             history_entry = {
-                'regulation_file': os.path.basename(app_state.get('regulation_file', 'Unknown')) if app_state.get('regulation_file') else 'GDPR (pre-loaded)',
-                'proposal_file': os.path.basename(app_state.get('proposal_file', 'Unknown')) if app_state.get('proposal_file') else 'Unknown',
+                'regulation_file': os.path.basename(regulation_file) if regulation_file else 'GDPR (pre-loaded)',
+                'proposal_file': os.path.basename(proposal_file) if proposal_file else 'Unknown',
                 'summary': {
                     'total': summary['total'],
                     'compliant': summary['compliant'],
@@ -594,7 +1078,7 @@ def run_compliance_check():
                     'compliance_rate': summary['compliance_rate']
                 },
                 'overall_status': report['overall_status'],
-                'model': get_current_model(),
+                'model': model,
                 'results': frontend_results
             }
             add_to_history(history_entry)
@@ -625,33 +1109,35 @@ def run_compliance_check():
             'message': f'Error during compliance check: {str(e)}'
         }), 500
 
+@app.route('/compliance-detail/<int:idx>', methods=['GET'])
+def compliance_detail(idx):
+    """Full raw result of one regulation from the last compliance check"""
+    store = get_session_state()
+    with store['lock']:
+        results = store.get('last_results')
+    
+    if not results or not 0 <= idx < len(results):
+        return jsonify({'success': False, 'message': 'Result not found'}), 404
+    
+    return jsonify({'success': True, 'result': results[idx]})
+
 @app.route('/export-report', methods=['GET'])
 def export_report():
     """Export the compliance report as JSON"""
     try:
-        regulations = app_state.get('extracted_regulations', [])
-        proposal_text = app_state.get('proposal_text')
+        store = get_session_state()
+        with store['lock']:
+            report = store.get('last_report')
         
-        if not regulations or not proposal_text:
+        # The last report is cleared whenever new regulations or a new
+        # proposal are processed, so it always matches the current inputs
+        if report is None:
             return jsonify({
                 'success': False,
-                'message': 'No compliance check has been run yet.'
+                'message': 'No compliance check has been run yet. Run a check first.'
             }), 400
         
-        # Re-run compliance check to get fresh results
-        results = check_all_regulations(
-            regulations=regulations,
-            proposal_chunk=proposal_text,
-            model="gpt-5.2",
-            verbose=False
-        )
-        
-        report = generate_compliance_report(results)
-        
-        return jsonify({
-            'success': True,
-            'report': report
-        })
+        return Response(_iter_report_json(report), mimetype='application/json')
         
     except Exception as e:
         return jsonify({
@@ -659,18 +1145,40 @@ def export_report():
             'message': f'Error exporting report: {str(e)}'
         }), 500
 
+def _iter_report_json(report):
+    """
+    Serialize {'success': true, 'report': report} piece by piece, one list
+    item at a time, so a large report is never encoded as a single buffer
+    """
+    def dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, default=str)
+    
+    yield b'{"success":true,"report":{'
+    for n, (key, value) in enumerate(report.items()):
+        yield (b',' if n else b'') + dumps(key) + b':'
+        if isinstance(value, list):
+            yield b'['
+            for i, item in enumerate(value):
+                yield (b',' if i else b'') + dumps(item)
+            yield b']'
+        else:
+            yield dumps(value)
+    yield b'}}'
+
 @app.route('/load-saved-regulations', methods=['POST'])
 def load_saved_regulations():
     """Load pre-extracted regulations from deduplicated_regulations.json"""
     try:
-        # Use deduplicated_regulations.json as the primary source
-        json_path = os.path.join(os.path.dirname(__file__), 'deduplicated_regulations.json')
-        
-        if not os.path.exists(json_path):
-            # Fallback to extracted_regulations.json if deduplicated doesn't exist
-            json_path = os.path.join(os.path.dirname(__file__), 'extracted_regulations.json')
-            
-        if not os.path.exists(json_path):
+        # Use deduplicated_regulations.json as the primary source,
+        # falling back to extracted_regulations.json if it doesn't exist
+        for name in ('deduplicated_regulations.json', 'extracted_regulations.json'):
+            json_path = os.path.join(os.path.dirname(__file__), name)
+            try:
+                data = load_json_cached(json_path)
+                break
+            except FileNotFoundError:
+                continue
+        else:
             return jsonify({
                 'success': False,
                 'message': 'No regulations file found. Please process a regulation document first.'
@@ -678,9 +1186,6 @@ def load_saved_regulations():
         
         send_log(f"📄 Loading regulations from: {os.path.basename(json_path)}")
         
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
         # Handle different JSON structures
         if isinstance(data, list):
             regulations = data
@@ -694,29 +1199,19 @@ def load_saved_regulations():
         else:
             regulations = []
         
-        app_state['extracted_regulations'] = regulations
-        
-        # Collect domains and keywords
-        domains = set()
-        keywords = set()
-        for reg in regulations:
-            if reg.get('domain') and isinstance(reg['domain'], dict):
-                primary = reg['domain'].get('primary_domain')
-                if primary:
-                    domains.add(primary)
-            if reg.get('keywords'):
-                keywords.update(reg['keywords'][:10])
+        summary = set_extracted_regulations(get_session_state(), regulations)
+        domains = summary['domains']
         
         send_log(f"✅ Loaded {len(regulations)} pre-extracted GDPR regulations", 'success')
-        send_log(f"   Domains: {list(domains)[:5]}")
+        send_log(f"   Domains: {domains[:5]}")
         
         return jsonify({
             'success': True,
             'message': f'Loaded {len(regulations)} GDPR regulations',
             'features': {
                 'total_regulations': len(regulations),
-                'categories': list(domains)[:10],
-                'keywords': list(keywords)[:20]
+                'categories': domains[:10],
+                'keywords': summary['keywords'][:20]
             }
         })
         
@@ -732,13 +1227,7 @@ def load_saved_regulations():
 @app.route('/reset', methods=['POST'])
 def reset_state():
     """Reset the application state"""
-    global app_state
-    app_state = {
-        'regulation_file': None,
-        'proposal_file': None,
-        'extracted_regulations': [],
-        'proposal_text': None
-    }
+    SESSIONS.reset(g.sid)
     return jsonify({'success': True, 'message': 'State reset successfully'})
 
 # ============================================================
@@ -785,6 +1274,12 @@ def update_settings():
             settings['max_regulations_to_check'] = int(data['max_regulations_to_check'])
         if 'quality_threshold' in data:
             settings['quality_threshold'] = int(data['quality_threshold'])
+        if 'api_concurrency' in data:
+            settings['api_concurrency'] = max(1, int(data['api_concurrency']))
+        if 'ccm_concurrency' in data:
+            settings['ccm_concurrency'] = max(1, int(data['ccm_concurrency']))
+        if 'relevant_passages' in data:
+            settings['relevant_passages'] = max(0, int(data['relevant_passages']))
         
         save_settings(settings)
         current_settings = settings
@@ -818,18 +1313,16 @@ def get_history():
 @app.route('/api/history/<int:history_id>', methods=['GET'])
 def get_history_item(history_id):
     """Get a specific history item"""
-    history = load_history()
-    for item in history:
-        if item.get('id') == history_id:
-            return jsonify(item)
+    item = get_history_entry(history_id)
+    if item is not None:
+        return jsonify(item)
     return jsonify({'error': 'Not found'}), 404
 
 @app.route('/api/history/<int:history_id>', methods=['DELETE'])
 def delete_history_item(history_id):
     """Delete a history item"""
-    history = load_history()
-    history = [item for item in history if item.get('id') != history_id]
-    save_history(history)
+    if get_history_entry(history_id) is not None:
+        save_history([item for item in load_history() if item.get('id') != history_id])
     return jsonify({'success': True})
 
 @app.route('/api/history/clear', methods=['POST'])
@@ -839,4 +1332,5 @@ def clear_history():
     return jsonify({'success': True, 'message': 'History cleared'})
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    # Development server only; set FLASK_DEBUG=0 to turn off the debugger and reloader
+    app.run(debug=os.environ.get('FLASK_DEBUG', '1') != '0', port=5000, threaded=True)
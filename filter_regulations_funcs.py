@@ -1,130 +1,152 @@
-from typing import Dict, List
+import io
+import sys
+from typing import Dict, List, Tuple
 
 # 🔍 Filter functions for quality control of extracted regulations
 
-def calculate_regulation_quality_score(regulation: Dict) -> Dict:
-    """
-    Calculate a quality score for a regulation based on completeness and validity.
-    Returns a dict with score, reasons, and recommendation.
+# Placeholder values the extractor writes for missing information
+_NULLS = frozenset([None, "null", "", "N/A", "Unknown"])
+_NULLS_NO_UNK = frozenset([None, "null", "", "N/A"])
+_BLANKS = frozenset([None, "null", ""])
+
+# Scored fields and their points, out of 100
+CRITICAL_FIELDS = (
+    ("regulation_id", 10),
+    ("regulation_name", 10),
+    ("regulation_type", 10),
+    ("description", 10)
+)
+IMPORTANT_FIELDS = (
+    ("jurisdiction", 6),
+    ("domain", 6),
+    ("scope", 6),
+    ("requirements", 6),
+    ("restrictions", 6)
+)
+SUPPLEMENTARY_FIELDS = (
+    ("rights_granted", 5),
+    ("exceptions", 5),
+    ("compliance_requirements", 5),
+    ("enforcement", 5),
+    ("dates", 5),
+    ("keywords", 5)
+)
+
+# (field, points, tier) in scoring order, so scoring runs a single loop over all tiers
+FIELD_SPECS = (
+    *((field, points, "critical") for field, points in CRITICAL_FIELDS),
+    *((field, points, "important") for field, points in IMPORTANT_FIELDS),
+    *((field, points, "supplementary") for field, points in SUPPLEMENTARY_FIELDS),
+)
+
+# Source section text that marks an introductory/overview section
+OVERVIEW_SECTION_KEYWORDS = ("april 2016", "regulation", "chapter i", "general provisions", "preamble")
+
+
+def _is_filled(value, nulls: frozenset = _NULLS) -> bool:
+    """True if `value` is non-empty and not one of the placeholder strings in `nulls`."""
+    # Only strings can match a placeholder; dicts and lists are unhashable
+    return bool(value) and not (isinstance(value, str) and value in nulls)
+
+
+def _count_nulls(obj, max_depth: int = 5) -> Tuple[int, int]:
     """
-    score = 0
-    max_score = 100
-    issues = []
-    strengths = []
+    Count placeholder leaves and all leaves in a nested dict/list structure.
     
-    # === CRITICAL FIELDS (40 points) ===
-    critical_fields = {
-        "regulation_id": 10,
-        "regulation_name": 10,
-        "regulation_type": 10,
-        "description": 10
-    }
+    Empty lists inside dicts count as null leaves. Containers nested deeper
+    than `max_depth` are not counted.
     
-    for field, points in critical_fields.items():
-        value = regulation.get(field)
-        if value and value not in [None, "null", "", "N/A", "Unknown"]:
-            if isinstance(value, dict):
-                # Check if dict has actual content
-                non_null_values = [v for v in value.values() if v and v not in [None, "null", ""]]
-                if len(non_null_values) > 0:
-                    score += points
-                    strengths.append(f"✓ {field} is present")
-                else:
-                    issues.append(f"✗ {field} is empty dict")
-            else:
-                score += points
-                strengths.append(f"✓ {field} is present")
-        else:
-            issues.append(f"✗ Missing critical field: {field}")
-    
-    # === IMPORTANT FIELDS (30 points) ===
-    important_fields = {
-        "jurisdiction": 6,
-        "domain": 6,
-        "scope": 6,
-        "requirements": 6,
-        "restrictions": 6
-    }
-    
-    for field, points in important_fields.items():
-        value = regulation.get(field)
-        if value and value not in [None, "null", ""]:
-            if isinstance(value, dict):
-                non_null = sum(1 for v in value.values() if v and v not in [None, "null", "", []])
-                total = len(value)
-                if total > 0:
-                    partial_score = points * (non_null / total)
-                    score += partial_score
-                    if non_null >= total * 0.5:
-                        strengths.append(f"✓ {field} is {int(non_null/total*100)}% complete")
-                    else:
-                        issues.append(f"⚠ {field} is only {int(non_null/total*100)}% complete")
-            elif isinstance(value, list):
-                if len(value) > 0:
-                    score += points
-                    strengths.append(f"✓ {field} has {len(value)} items")
-                else:
-                    issues.append(f"⚠ {field} is empty list")
-            else:
-                score += points
-        else:
-            issues.append(f"⚠ Missing important field: {field}")
-    
-    # === SUPPLEMENTARY FIELDS (30 points) ===
-    supplementary_fields = {
-        "rights_granted": 5,
-        "exceptions": 5,
-        "compliance_requirements": 5,
-        "enforcement": 5,
-        "dates": 5,
-        "keywords": 5
-    }
-    
-    for field, points in supplementary_fields.items():
-        value = regulation.get(field)
-        if value and value not in [None, "null", ""]:
-            if isinstance(value, dict):
-                non_null = sum(1 for v in value.values() if v and v not in [None, "null", "", []])
-                if non_null > 0:
-                    score += points * min(1, non_null / 2)  # At least 2 sub-fields for full points
-            elif isinstance(value, list) and len(value) > 0:
-                score += points
-            else:
-                score += points
+    Returns:
+        Tuple of (null_count, total_count)
+    """
+    null_count = 0
+    total_count = 0
+    # Explicit stack of (container, depth) instead of recursion
+    stack = [(obj, 0)]
     
-    # === PENALTY FOR EXCESSIVE NULL VALUES ===
-    def count_nulls(obj, depth=0):
-        if depth > 5:  # Prevent infinite recursion
-            return 0, 0
-        null_count = 0
-        total_count = 0
+    while stack:
+        obj, depth = stack.pop()
+        if depth > max_depth:
+            continue
         
         if isinstance(obj, dict):
             for v in obj.values():
-                if v in [None, "null", "", "N/A", "Unknown", []]:
-                    null_count += 1
-                    total_count += 1
-                elif isinstance(v, (dict, list)):
-                    n, t = count_nulls(v, depth + 1)
-                    null_count += n
-                    total_count += t
+                if isinstance(v, (dict, list)):
+                    if isinstance(v, list) and not v:
+                        null_count += 1
+                        total_count += 1
+                    else:
+                        stack.append((v, depth + 1))
                 else:
                     total_count += 1
+                    if v in _NULLS:
+                        null_count += 1
         elif isinstance(obj, list):
             for item in obj:
                 if isinstance(item, (dict, list)):
-                    n, t = count_nulls(item, depth + 1)
-                    null_count += n
-                    total_count += t
-                elif item in [None, "null", "", "N/A"]:
-                    null_count += 1
-                    total_count += 1
+                    stack.append((item, depth + 1))
                 else:
                     total_count += 1
-        
-        return null_count, total_count
+                    if item in _NULLS_NO_UNK:
+                        null_count += 1
+    
+    return null_count, total_count
+
+
+def _score_field(field: str, value, points: float, tier: str,
+                 issues: List[str], strengths: List[str]) -> float:
+    """Points earned by one scored field; appends its issue/strength messages."""
+    if tier == "critical":
+        if not _is_filled(value):
+            issues.append(f"✗ Missing critical field: {field}")
+            return 0
+        # A dict needs actual content
+        if isinstance(value, dict) and not any(_is_filled(v, _BLANKS) for v in value.values()):
+            issues.append(f"✗ {field} is empty dict")
+            return 0
+        strengths.append(f"✓ {field} is present")
+        return points
+    
+    if not _is_filled(value, _BLANKS):
+        if tier == "important":
+            issues.append(f"⚠ Missing important field: {field}")
+        return 0
+    
+    if isinstance(value, dict):
+        non_null = sum(1 for v in value.values() if _is_filled(v, _BLANKS))
+        if tier == "supplementary":
+            # At least 2 sub-fields for full points
+            return points * min(1, non_null / 2) if non_null > 0 else 0
+        # Non-empty here, since empty dicts fail the check above
+        total = len(value)
+        if non_null >= total * 0.5:
+            strengths.append(f"✓ {field} is {int(non_null/total*100)}% complete")
+        else:
+            issues.append(f"⚠ {field} is only {int(non_null/total*100)}% complete")
+        return points * (non_null / total)
     
-    null_count, total_count = count_nulls(regulation)
+    if tier == "important" and isinstance(value, list):
+        strengths.append(f"✓ {field} has {len(value)} items")
+    return points
+
+
+def calculate_regulation_quality_score(regulation: Dict) -> Dict:
+    """
+    Calculate a quality score for a regulation based on completeness and validity.
+    Returns a dict with score, reasons, and recommendation.
+    """
+    score = 0
+    max_score = 100
+    issues = []
+    strengths = []
+    
+    # === CRITICAL (40), IMPORTANT (30) AND SUPPLEMENTARY (30) FIELDS ===
+    get = regulation.get
+    for field, points, tier in FIELD_SPECS:
+        score += _score_field(field, get(field), points, tier, issues, strengths)
+    
+    # === PENALTY FOR EXCESSIVE NULL VALUES ===
+    null_count, total_count = _count_nulls(regulation)
     null_ratio = null_count / total_count if total_count > 0 else 1
     
     if null_ratio > 0.7:
@@ -176,29 +198,33 @@ def filter_regulations(regulations: List[Dict],
     kept = []
     review = []
     discarded = []
+    total_score = 0
+    # Render into a buffer and write it out once
+    out = io.StringIO()
     
-    print(f"\n{'='*70}")
-    print(f"🔍 REGULATION QUALITY FILTER")
-    print(f"{'='*70}")
-    print(f"   Minimum score to keep: {min_score}")
-    print(f"   Total regulations to analyze: {len(regulations)}")
-    print(f"{'='*70}\n")
+    print(f"\n{'='*70}", file=out)
+    print(f"🔍 REGULATION QUALITY FILTER", file=out)
+    print(f"{'='*70}", file=out)
+    print(f"   Minimum score to keep: {min_score}", file=out)
+    print(f"   Total regulations to analyze: {len(regulations)}", file=out)
+    print(f"{'='*70}\n", file=out)
     
     for i, reg in enumerate(regulations):
         quality = calculate_regulation_quality_score(reg)
         reg["_quality_score"] = quality
-        
-        reg_name = reg.get("regulation_name", reg.get("regulation_id", f"Regulation {i+1}"))
-        reg_name = reg_name[:50] + "..." if len(str(reg_name)) > 50 else reg_name
+        total_score += quality["score"]
         
         if show_details:
-            print(f"{quality['status']} [{quality['percentage']:5.1f}%] {reg_name}")
-            print(f"   └─ Recommendation: {quality['recommendation']} | Null ratio: {quality['null_ratio']}%")
+            reg_name = str(reg.get("regulation_name") or reg.get("regulation_id") or f"Regulation {i+1}")
+            reg_name = reg_name[:50] + "..." if len(reg_name) > 50 else reg_name
+            
+            print(f"{quality['status']} [{quality['percentage']:5.1f}%] {reg_name}", file=out)
+            print(f"   └─ Recommendation: {quality['recommendation']} | Null ratio: {quality['null_ratio']}%", file=out)
             
             if quality['issues'] and len(quality['issues']) <= 3:
                 for issue in quality['issues'][:3]:
-                    print(f"      {issue}")
-            print()
+                    print(f"      {issue}", file=out)
+            print(file=out)
         
         if quality["score"] >= 70:
             kept.append(reg)
@@ -208,13 +234,14 @@ def filter_regulations(regulations: List[Dict],
             discarded.append(reg)
     
     # Summary
-    print(f"\n{'='*70}")
-    print(f"📊 FILTER SUMMARY")
-    print(f"{'='*70}")
-    print(f"   🟢 KEPT (score ≥ 70):      {len(kept):3d} regulations")
-    print(f"   🟡 REVIEW (score ≥ {min_score}):    {len(review):3d} regulations")
-    print(f"   🔴 DISCARDED (score < {min_score}): {len(discarded):3d} regulations")
-    print(f"{'='*70}")
+    print(f"\n{'='*70}", file=out)
+    print(f"📊 FILTER SUMMARY", file=out)
+    print(f"{'='*70}", file=out)
+    print(f"   🟢 KEPT (score ≥ 70):      {len(kept):3d} regulations", file=out)
+    print(f"   🟡 REVIEW (score ≥ {min_score}):    {len(review):3d} regulations", file=out)
+    print(f"   🔴 DISCARDED (score < {min_score}): {len(discarded):3d} regulations", file=out)
+    print(f"{'='*70}", file=out)
+    sys.stdout.write(out.getvalue())
     
     return {
         "kept": kept,
@@ -226,7 +253,7 @@ def filter_regulations(regulations: List[Dict],
             "review_count": len(review),
             "discarded_count": len(discarded),
             "kept_percentage": round(len(kept) / len(regulations) * 100, 1) if regulations else 0,
-            "avg_score": round(sum(r["_quality_score"]["score"] for r in regulations) / len(regulations), 1) if regulations else 0
+            "avg_score": round(total_score / len(regulations), 1) if regulations else 0
         }
     }
 
@@ -238,35 +265,53 @@ def is_general_overview(regulation: Dict) -> bool:
     Detect if a regulation entry is a general overview vs specific article.
     """
     indicators = 0
+    get = regulation.get
     
-    # Check 1: No specific article number in ID
-    reg_id = str(regulation.get("regulation_id", "")).lower()
-    if "article" not in reg_id and "section" not in reg_id and "chapter" not in reg_id:
-        indicators += 1
+    # The two strong indicators (+2 each) come first; after each check, stop
+    # as soon as the remaining weak indicators (+1 each) cannot change the answer
     
-    # Check 2: Too many mandatory obligations (general overviews have many)
-    requirements = regulation.get("requirements", {})
+    # Check 1: Too many mandatory obligations (general overviews have many)
+    requirements = get("requirements", {})
     mandatory = requirements.get("mandatory_obligations", [])
     if len(mandatory) > 10:
         indicators += 2  # Strong indicator
     
-    # Check 3: Too many individual rights listed
-    rights = regulation.get("rights_granted", {})
+    # Check 2: Too many individual rights listed
+    rights = get("rights_granted", {})
     individual_rights = rights.get("individual_rights", [])
     if len(individual_rights) > 8:
         indicators += 2  # Strong indicator
     
-    # Check 4: Source section is intro/overview
-    source = str(regulation.get("source_section", "")).lower()
-    overview_keywords = ["april 2016", "regulation", "chapter i", "general provisions", "preamble"]
-    if any(kw in source for kw in overview_keywords):
-        indicators += 1
+    if indicators >= 3:
+        return True
     
-    # Check 5: Too many key definitions (overviews define everything)
-    definitions = regulation.get("key_definitions", {})
+    # Check 3: Too many key definitions (overviews define everything)
+    definitions = get("key_definitions", {})
     if len(definitions) > 8:
         indicators += 1
     
+    # Two weak indicators left
+    if indicators >= 3:
+        return True
+    if indicators + 2 < 3:
+        return False
+    
+    # Check 4: No specific article number in ID
+    reg_id = str(get("regulation_id", "")).lower()
+    if "article" not in reg_id and "section" not in reg_id and "chapter" not in reg_id:
+        indicators += 1
+    
+    # One weak indicator left
+    if indicators >= 3:
+        return True
+    if indicators + 1 < 3:
+        return False
+    
+    # Check 5: Source section is intro/overview
+    source = str(get("source_section", "")).lower()
+    if any(kw in source for kw in OVERVIEW_SECTION_KEYWORDS):
+        indicators += 1
+    
     return indicators >= 3
 
 
@@ -0,0 +1,174 @@
+"""
+LLM response caching utilities for ARCCS.
+
+Caches let repeated runs over the same (or nearly the same) inputs skip
+the OpenAI API entirely:
+- ResponseCache: exact-match lookup keyed by a hash of the full request
+- SemanticCache: embedding-based lookup of compliance verdicts
+"""
+
+import atexit
+import hashlib
+import math
+import shelve
+import threading
+from typing import Dict, List, Optional, Set
+
+import openai
+
+
+class ResponseCache:
+    """
+    Exact-match cache of parsed LLM responses.
+
+    Entries are keyed by the SHA-256 of the request parts (model, system
+    message, prompt, ...), so only byte-identical requests hit.
+
+    With a `path`, the shelve file is read once, on first use, and new
+    entries are written back in one go by flush(). flush() runs at
+    interpreter exit; call it earlier to persist entries sooner. Opening
+    the shelf per access is avoided because with the dbm.dumb backend
+    every open and close re-reads and rewrites the whole index.
+
+    Args:
+        path: Optional shelve file path to persist entries across runs
+              (in-memory only when None)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Dict] = {}
+        # Keys set since the last flush
+        self._dirty: Set[str] = set()
+        self._loaded = path is None
+        if path:
+            atexit.register(self.flush)
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Hash the request parts into a cache key."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _load(self):
+        """Read the persisted entries into memory; call with the lock held."""
+        if self._loaded:
+            return
+        self._loaded = True
+        with shelve.open(self.path) as db:
+            for key in db.keys():
+                # Entries set before the first load are newer
+                if key not in self._memory:
+                    self._memory[key] = db[key]
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached response for `key`, or None on a miss."""
+        with self._lock:
+            self._load()
+            value = self._memory.get(key)
+
+        return dict(value) if value is not None else None
+
+    def set(self, key: str, value: Dict):
+        """Store a parsed response under `key` (persisted by the next flush)."""
+        with self._lock:
+            self._memory[key] = dict(value)
+            if self.path:
+                self._dirty.add(key)
+
+    def flush(self):
+        """Write the entries set since the last flush to the shelve file."""
+        with self._lock:
+            if not self._dirty:
+                return
+            with shelve.open(self.path) as db:
+                for key in self._dirty:
+                    db[key] = self._memory[key]
+            self._dirty.clear()
+
+
+class SemanticCache:
+    """
+    Embedding-based cache of compliance verdicts.
+
+    Verdicts are grouped per regulation_id together with the embedding of
+    the document they were computed on. A lookup returns the stored verdict
+    whose document embedding has the highest cosine similarity with the
+    query, provided it reaches `threshold`.
+
+    As with ResponseCache, new verdicts are written to the shelve file in
+    one go by flush(), which also runs at interpreter exit.
+
+    Args:
+        path: Optional shelve file path to persist entries across runs
+              (in-memory only when None)
+        threshold: Minimum cosine similarity for a cache hit
+        embedding_model: OpenAI embedding model used by embed()
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.95,
+        embedding_model: str = "text-embedding-3-small"
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.embedding_model = embedding_model
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List] = {}
+        # Regulation ids stored since the last flush
+        self._dirty: Set[str] = set()
+
+        if path:
+            with shelve.open(path) as db:
+                self._entries = dict(db)
+            atexit.register(self.flush)
+
+    def embed(self, text: str) -> List[float]:
+        """Return the L2-normalized embedding of `text`."""
+        response = openai.embeddings.create(model=self.embedding_model, input=text)
+        return _normalize(response.data[0].embedding)
+
+    def lookup(self, regulation_id: str, embedding: List[float]) -> Optional[Dict]:
+        """Return a copy of the closest cached verdict, or None on a miss."""
+        with self._lock:
+            entries = self._entries.get(regulation_id, [])
+            best_score = self.threshold
+            best_result = None
+            for cached_embedding, result in entries:
+                score = sum(a * b for a, b in zip(cached_embedding, embedding))
+                if score >= best_score:
+                    best_score = score
+                    best_result = result
+
+        if best_result is None:
+            return None
+        return dict(best_result, cache_hit=True)
+
+    def store(self, regulation_id: str, embedding: List[float], result: Dict):
+        """Add a verdict for `regulation_id` computed on a document with `embedding` (persisted by the next flush)."""
+        with self._lock:
+            entries = self._entries.setdefault(regulation_id, [])
+            entries.append((embedding, dict(result)))
+            if self.path:
+                self._dirty.add(regulation_id)
+
+    def flush(self):
+        """Write the verdicts stored since the last flush to the shelve file."""
+        with self._lock:
+            if not self._dirty:
+                return
+            with shelve.open(self.path) as db:
+                for regulation_id in self._dirty:
+                    db[regulation_id] = self._entries[regulation_id]
+            self._dirty.clear()
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
@@ -0,0 +1,114 @@
+"""
+Retry and throttling helpers for OpenAI API calls in ARCCS.
+
+Transient API failures (rate limits, timeouts, connection drops, 5xx) are
+retried with randomized exponential backoff, so that they do not end up
+in the error-result paths of RPEM/CCM. Any other exception is raised
+immediately.
+
+run_coroutine lets the synchronous entry points drive their async
+implementations, including from inside a running event loop (Jupyter).
+"""
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Coroutine, TypeVar
+
+import openai
+
+T = TypeVar("T")
+
+TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+MAX_ATTEMPTS = 6
+MIN_WAIT = 1.0
+MAX_WAIT = 60.0
+
+
+def backoff_delay(attempt: int) -> float:
+    """Random exponential backoff delay (seconds) before retry number `attempt`."""
+    return random.uniform(0, min(MAX_WAIT, MIN_WAIT * 2 ** attempt))
+
+
+def call_with_retry(fn: Callable[[], T], max_attempts: int = MAX_ATTEMPTS) -> T:
+    """
+    Call `fn`, retrying transient OpenAI errors with exponential backoff.
+
+    Args:
+        fn: Zero-argument callable performing the API request
+        max_attempts: Total number of attempts before giving up
+
+    Returns:
+        The return value of `fn`
+    """
+    for attempt in range(max_attempts):
+        try:
+            return fn()
+        except TRANSIENT_ERRORS as e:
+            if attempt == max_attempts - 1:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"   ⏳ {type(e).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{max_attempts - 1})")
+            time.sleep(delay)
+
+
+async def call_with_retry_async(
+    fn: Callable[[], Awaitable[T]],
+    max_attempts: int = MAX_ATTEMPTS
+) -> T:
+    """Async counterpart of call_with_retry; `fn` returns an awaitable."""
+    for attempt in range(max_attempts):
+        try:
+            return await fn()
+        except TRANSIENT_ERRORS as e:
+            if attempt == max_attempts - 1:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"   ⏳ {type(e).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{max_attempts - 1})")
+            await asyncio.sleep(delay)
+
+
+class AsyncRateLimiter:
+    """
+    Spaces out request starts to stay under a requests-per-minute budget.
+
+    Args:
+        max_requests_per_minute: Maximum number of requests started per minute
+    """
+
+    def __init__(self, max_requests_per_minute: float):
+        self.interval = 60.0 / max_requests_per_minute
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until the next request slot is available."""
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def run_coroutine(coro: Coroutine[object, object, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+    
+    Falls back to a helper thread when an event loop is already running
+    (e.g. inside Jupyter), where asyncio.run() cannot be called directly.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
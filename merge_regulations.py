@@ -1,52 +1,125 @@
 import openai
+import asyncio
+import io
+import jiter
 import json
-from typing import List, Dict, Tuple
+import orjson
+import os
+import re
+import sys
+import tempfile
+from collections import defaultdict
+from typing import List, Dict, Optional, Tuple
 
-def merge_duplicate_regulations(
-    regulations: List[Dict],
-    api_key: str,
-    model: str = "gpt-5.2",
-    batch_size: int = 50
-) -> Tuple[List[Dict], List[Dict]]:
+from llm_cache import ResponseCache
+from llm_retry import call_with_retry_async, run_coroutine
+
+_ARTICLE_RE = re.compile(r'\b(?:art|article)\b\.?')
+_SECTION_RE = re.compile(r'\b(?:sec|section)\b\.?|§')
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+_ROMAN_NUMERAL_RE = re.compile(r'^[ivxlc]+$')
+
+# Words that locate a provision inside a law, or only say what kind of
+# law it is ("the Regulation"), rather than naming the law
+_STRUCTURE_WORDS = frozenset((
+    "article", "section", "chapter", "paragraph", "para", "par", "subsection",
+    "clause", "point", "recital", "annex", "title", "part", "no", "nr",
+    "number", "of", "the", "and", "this", "regulation", "directive", "act",
+    "law", "code"
+))
+
+
+def _repr_prefix(value, limit: int) -> str:
     """
-    Merge duplicate regulations by identifying exact duplicates and keeping 
-    only the most specific/detailed version.
+    Same as str(value)[:limit], but for dicts only the items needed to
+    reach `limit` characters are converted.
+    """
+    if not isinstance(value, dict):
+        return str(value)[:limit]
+    parts = []
+    length = 1
+    for k, v in value.items():
+        part = f"{k!r}: {v!r}"
+        length += len(part) + (2 if parts else 0)
+        parts.append(part)
+        if length >= limit:
+            break
+    return ("{" + ", ".join(parts) + "}")[:limit]
+
+
+def _canonical_key(reg: Dict) -> Optional[str]:
+    """
+    Normalized regulation_id, e.g. "GDPR Art. 5" and "gdpr article 5" both
+    give "gdpr article 5".
     
-    Args:
-        regulations: List of regulation dictionaries
-        api_key: OpenAI API key
-        model: Model to use (default gpt-5.2)
-        batch_size: Number of regulations to process at once
-        
-    Returns:
-        Tuple of (cleaned_regulations, deletion_log)
+    Returns None unless the ID has both a number and a word naming the
+    law: "GDPR" alone does not pin down an article, and "Article 5" alone
+    could come from any law (GDPR Article 5 and AI Act Article 5 are
+    different regulations).
     """
-    openai.api_key = api_key
+    key = str(reg.get("regulation_id") or "").lower()
+    key = _ARTICLE_RE.sub(" article ", key)
+    key = _SECTION_RE.sub(" section ", key)
+    key = _NON_ALNUM_RE.sub(" ", key).strip()
+    if not any(c.isdigit() for c in key):
+        return None
+    if not any(
+        token.isalpha() and len(token) > 1
+        and token not in _STRUCTURE_WORDS and not _ROMAN_NUMERAL_RE.match(token)
+        for token in key.split()
+    ):
+        return None
+    return key
+
+
+def _merge_exact_id_duplicates(regulations: List[Dict]) -> List[Dict]:
+    """
+    Find regulations whose IDs match after normalization (see _canonical_key).
     
-    if len(regulations) <= 1:
-        return regulations, []
+    In each group the regulation with the longest description is kept
+    (the later one on ties, as later sections tend to be more detailed).
     
-    # Prepare simplified regulation summaries for the LLM
-    reg_summaries = []
+    Returns:
+        Duplicates in the same form the LLM returns them
+        (delete_index, keep_index, regulation_id, reason)
+    """
+    buckets = defaultdict(list)
     for i, reg in enumerate(regulations):
-        summary = {
-            "index": i,
-            "regulation_id": reg.get("regulation_id", "N/A"),
-            "regulation_name": reg.get("regulation_name", "Unknown"),
-            "regulation_type": reg.get("regulation_type", "N/A"),
-            "source_section": reg.get("source_section", "N/A"),
-            "description_brief": reg.get("description", {}).get("brief_summary", "")[:300] if isinstance(reg.get("description"), dict) else str(reg.get("description", ""))[:300],
-            "requirements_summary": str(reg.get("requirements", {}))[:500]
-        }
-        reg_summaries.append(summary)
-    
-    # Process in batches if needed
-    all_deletions = []
+        key = _canonical_key(reg)
+        if key is not None:
+            buckets[key].append(i)
     
-    for batch_start in range(0, len(reg_summaries), batch_size):
-        batch = reg_summaries[batch_start:batch_start + batch_size]
-        
-        prompt = f"""You are a legal expert analyzing a list of extracted regulations for EXACT DUPLICATES.
+    duplicates = []
+    for key, indices in buckets.items():
+        if len(indices) < 2:
+            continue
+        keep_idx = max(indices, key=lambda i: (
+            len(json.dumps(regulations[i].get("description"), ensure_ascii=False, default=str)), i
+        ))
+        for i in indices:
+            if i != keep_idx:
+                duplicates.append({
+                    "delete_index": i,
+                    "keep_index": keep_idx,
+                    "regulation_id": regulations[keep_idx].get("regulation_id"),
+                    "reason": f"Same regulation ID ('{key}'); kept the version with the most detailed description"
+                })
+    return duplicates
+
+
+DEDUP_SYSTEM_PROMPT = "You are a precise legal analyst. Only identify EXACT duplicate regulations. Be conservative - when in doubt, do not mark as duplicate. Always respond with valid JSON only."
+
+# Maximum number of batches sent to the model at once
+DEFAULT_CONCURRENCY = 8
+
+# Exact-match cache of batch answers, so reruns on the same regulations are
+# free; pass response_cache=None to bypass
+DEDUP_RESPONSE_CACHE = ResponseCache(os.path.join(tempfile.gettempdir(), "arccs_dedup_cache"))
+
+
+def _build_dedup_prompt(batch: List[Dict]) -> str:
+    """Prompt asking the model for exact duplicates within one batch of summaries."""
+    return f"""You are a legal expert analyzing a list of extracted regulations for EXACT DUPLICATES.
 
 These regulations were extracted from different sections of the same document. Some regulations appear multiple times because:
 1. Introductory chapters mention all regulations of a law broadly
@@ -63,7 +136,7 @@ IMPORTANT RULES:
 - When in doubt, DO NOT delete
 
 REGULATIONS TO ANALYZE:
-{json.dumps(batch, indent=2, ensure_ascii=False)}
+{json.dumps(batch, separators=(",", ":"), ensure_ascii=False)}
 
 Return a JSON response with this structure:
 {{
@@ -81,13 +154,75 @@ Return a JSON response with this structure:
 Return ONLY regulations that are CLEARLY THE SAME. If unsure, do not include them.
 Return ONLY valid JSON."""
 
-        try:
-            response = openai.chat.completions.create(
+
+def _parse_duplicates(text: str) -> Tuple[List[Dict], bool]:
+    """
+    Read the duplicates from the model's JSON answer.
+    
+    If the answer was cut off (e.g. at the token limit), the duplicates that
+    were written out completely are still returned.
+    
+    Returns:
+        Tuple of (duplicates, whether the answer was complete JSON)
+    """
+    data = text.encode("utf-8")
+    try:
+        result, complete = jiter.from_json(data), True
+    except ValueError:
+        # Raises ValueError again if the JSON is malformed rather than truncated
+        result, complete = jiter.from_json(data, partial_mode=True), False
+    
+    duplicates = result.get("duplicates_found", []) if isinstance(result, dict) else []
+    if not complete:
+        # "reason" is the last key, and partial strings are dropped, so
+        # entries that have it were written out completely
+        duplicates = [
+            dup for dup in duplicates
+            if isinstance(dup, dict) and "reason" in dup
+            and isinstance(dup.get("delete_index"), int) and isinstance(dup.get("keep_index"), int)
+        ]
+    return duplicates, complete
+
+
+async def _read_content_stream(stream) -> str:
+    """Accumulate the text of a streamed chat completion."""
+    parts = []
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+    finally:
+        await stream.close()
+    return "".join(parts)
+
+
+async def _find_batch_duplicates(
+    client: openai.AsyncOpenAI,
+    semaphore: asyncio.Semaphore,
+    batch_number: int,
+    batch: List[Dict],
+    model: str,
+    stream: bool = False,
+    response_cache: Optional[ResponseCache] = None
+) -> List[Dict]:
+    """Ask the model for duplicates in one batch; returns [] if the request fails."""
+    try:
+        prompt = _build_dedup_prompt(batch)
+        cache_key = ResponseCache.make_key(model, DEDUP_SYSTEM_PROMPT, prompt)
+        if response_cache is not None:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                duplicates = [dict(dup) for dup in cached["duplicates_found"]]
+                print(f"   📦 Batch {batch_number}: Found {len(duplicates)} duplicates (cached)")
+                return duplicates
+        
+        async with semaphore:
+            response = await call_with_retry_async(lambda: client.chat.completions.create(
                 model=model,
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are a precise legal analyst. Only identify EXACT duplicate regulations. Be conservative - when in doubt, do not mark as duplicate. Always respond with valid JSON only."
+                        "content": DEDUP_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -95,32 +230,146 @@ Return ONLY valid JSON."""
                     }
                 ],
                 temperature=0.0,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            
-            for dup in result.get("duplicates_found", []):
-                # Adjust indices for batch offset
-                dup["delete_index"] = dup["delete_index"] + batch_start if batch_start > 0 else dup["delete_index"]
-                dup["keep_index"] = dup["keep_index"] + batch_start if batch_start > 0 else dup["keep_index"]
-                all_deletions.append(dup)
-                
-            print(f"   📦 Batch {batch_start//batch_size + 1}: Found {len(result.get('duplicates_found', []))} duplicates")
-            
-        except Exception as e:
-            print(f"   ❌ Error processing batch: {str(e)}")
+                response_format={"type": "json_object"},
+                stream=stream
+            ))
+            if stream:
+                content = await _read_content_stream(response)
+            else:
+                content = response.choices[0].message.content
+        
+        duplicates, complete = _parse_duplicates(content)
+        if complete:
+            print(f"   📦 Batch {batch_number}: Found {len(duplicates)} duplicates")
+            # Cut-off answers are not cached, so a rerun can get the full answer
+            if response_cache is not None:
+                response_cache.set(cache_key, {"duplicates_found": duplicates})
+        else:
+            print(f"   ⚠️ Batch {batch_number}: Response was cut off, kept {len(duplicates)} complete duplicates")
+        # Indices refer to the "index" field of the summaries, i.e.
+        # positions in the full regulations list
+        return duplicates
+        
+    except Exception as e:
+        print(f"   ❌ Error processing batch: {str(e)}")
+        return []
+
+
+async def _find_duplicates_async(
+    batches: List[List[Dict]],
+    model: str,
+    concurrency: int,
+    stream: bool = False,
+    response_cache: Optional[ResponseCache] = None
+) -> List[Dict]:
+    """Run all batches concurrently; duplicates are returned in batch order."""
+    if not batches:
+        return []
+    
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    # Retries are handled by call_with_retry_async, not by the SDK
+    client = openai.AsyncOpenAI(api_key=openai.api_key, max_retries=0)
+    try:
+        per_batch = await asyncio.gather(*(
+            _find_batch_duplicates(client, semaphore, n, batch, model, stream, response_cache)
+            for n, batch in enumerate(batches, 1)
+        ))
+    finally:
+        await client.close()
+    
+    return [dup for duplicates in per_batch for dup in duplicates]
+
+
+def merge_duplicate_regulations(
+    regulations: List[Dict],
+    api_key: str,
+    model: str = "gpt-5.2",
+    batch_size: int = 50,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    stream: bool = False,
+    response_cache: Optional[ResponseCache] = DEDUP_RESPONSE_CACHE
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Merge duplicate regulations by identifying exact duplicates and keeping 
+    only the most specific/detailed version.
+    
+    Regulations with the same article/section ID are merged without the LLM;
+    only the remaining regulations are sent to the model.
+    
+    Args:
+        regulations: List of regulation dictionaries
+        api_key: OpenAI API key
+        model: Model to use (default gpt-5.2)
+        batch_size: Number of regulations to process at once
+        concurrency: Maximum number of batches sent to the model at once
+        stream: Stream the model's answers instead of waiting for each
+                response in one piece
+        response_cache: Exact-match cache of batch answers, persisted in the
+                        system temp dir (None to always call the model)
+        
+    Returns:
+        Tuple of (cleaned_regulations, deletion_log)
+    """
+    openai.api_key = api_key
+    
+    if len(regulations) <= 1:
+        return regulations, []
+    
+    # Exact ID matches need no LLM call
+    all_deletions = _merge_exact_id_duplicates(regulations)
+    id_duplicates = {dup["delete_index"] for dup in all_deletions}
+    if all_deletions:
+        print(f"   🔑 Found {len(all_deletions)} duplicates by regulation ID")
+    
+    # Prepare simplified regulation summaries for the LLM
+    reg_summaries = []
+    for i, reg in enumerate(regulations):
+        if i in id_duplicates:
             continue
+        
+        description = reg.get("description", "")
+        if isinstance(description, dict):
+            description_brief = description.get("brief_summary", "")[:300]
+        else:
+            description_brief = str(description)[:300]
+        
+        summary = {
+            "index": i,
+            "regulation_id": reg.get("regulation_id", "N/A"),
+            "regulation_name": reg.get("regulation_name", "Unknown"),
+            "regulation_type": reg.get("regulation_type", "N/A"),
+            "source_section": reg.get("source_section", "N/A"),
+            "description_brief": description_brief,
+            "requirements_summary": _repr_prefix(reg.get("requirements", {}), 500)
+        }
+        reg_summaries.append(summary)
+    
+    # Process in batches, sent to the model concurrently
+    batches = []
+    if len(reg_summaries) > 1:
+        batches = [
+            reg_summaries[batch_start:batch_start + batch_size]
+            for batch_start in range(0, len(reg_summaries), batch_size)
+        ]
+    all_deletions.extend(run_coroutine(
+        _find_duplicates_async(batches, model, concurrency, stream, response_cache)
+    ))
+    if response_cache is not None:
+        response_cache.flush()
     
     # Build deletion log with full regulation info
     deletion_log = []
     indices_to_delete = set()
+    n_regs = len(regulations)
     
     for dup in all_deletions:
         delete_idx = dup["delete_index"]
         keep_idx = dup["keep_index"]
         
-        if delete_idx < len(regulations) and keep_idx < len(regulations):
+        # Skip out-of-range or self-referencing indices from the model, and
+        # regulations already marked for deletion (one log entry each)
+        if (0 <= delete_idx < n_regs and 0 <= keep_idx < n_regs
+                and delete_idx != keep_idx and delete_idx not in indices_to_delete):
             deletion_log.append({
                 "deleted_regulation": {
                     "index": delete_idx,
@@ -153,25 +402,28 @@ def print_deduplication_report(
     deletion_log: List[Dict]
 ):
     """Print a summary report of the deduplication process."""
+    # Render into a buffer and write it out once
+    out = io.StringIO()
     
-    print(f"\n{'='*60}")
-    print(f"📊 DEDUPLICATION REPORT")
-    print(f"{'='*60}")
-    print(f"   Original regulations: {original_count}")
-    print(f"   After deduplication: {len(cleaned_regulations)}")
-    print(f"   Duplicates removed: {len(deletion_log)}")
-    print(f"   Reduction: {(len(deletion_log)/original_count)*100:.1f}%")
+    print(f"\n{'='*60}", file=out)
+    print(f"📊 DEDUPLICATION REPORT", file=out)
+    print(f"{'='*60}", file=out)
+    print(f"   Original regulations: {original_count}", file=out)
+    print(f"   After deduplication: {len(cleaned_regulations)}", file=out)
+    print(f"   Duplicates removed: {len(deletion_log)}", file=out)
+    print(f"   Reduction: {(len(deletion_log)/original_count)*100:.1f}%", file=out)
     
     if deletion_log:
-        print(f"\n📋 DELETIONS:")
+        print(f"\n📋 DELETIONS:", file=out)
         for i, entry in enumerate(deletion_log, 1):
-            print(f"\n   {i}. DELETED: {entry['deleted_regulation']['regulation_name']}")
-            print(f"      ID: {entry['deleted_regulation']['regulation_id']}")
-            print(f"      From section: {entry['deleted_regulation']['source_section'][:50]}...")
-            print(f"      ➡️ KEPT version from: {entry['kept_regulation']['source_section'][:50]}...")
-            print(f"      Reason: {entry['reason']}")
+            print(f"\n   {i}. DELETED: {entry['deleted_regulation']['regulation_name']}", file=out)
+            print(f"      ID: {entry['deleted_regulation']['regulation_id']}", file=out)
+            print(f"      From section: {entry['deleted_regulation']['source_section'][:50]}...", file=out)
+            print(f"      ➡️ KEPT version from: {entry['kept_regulation']['source_section'][:50]}...", file=out)
+            print(f"      Reason: {entry['reason']}", file=out)
     
-    print(f"\n{'='*60}")
+    print(f"\n{'='*60}", file=out)
+    sys.stdout.write(out.getvalue())
 
 
 def deduplicate_regulations(
@@ -213,8 +465,8 @@ def deduplicate_regulations(
     }
     
     if save_to_file:
-        with open(save_to_file, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        with open(save_to_file, "wb") as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         print(f"\n💾 Results saved to '{save_to_file}'")
     
     return result
@@ -204,6 +204,31 @@ function handleProposalFile(file) {
 }
 
 // ===== Process Handlers =====
+// POST to a job-starting endpoint and poll until the job's result is ready
+async function runJob(url) {
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        }
+    });
+    const started = await response.json();
+    if (!started.job_id) {
+        return started;
+    }
+    
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const status = await (await fetch('/job-status/' + started.job_id)).json();
+        if (status.done) {
+            return status.result;
+        }
+        if (status.done === undefined) {
+            return status;
+        }
+    }
+}
+
 async function processRegulation() {
     // First upload the file
     processRegulationBtn.disabled = true;
@@ -219,12 +244,14 @@ async function processRegulation() {
     
     try {
         // Upload the file
-        const formData = new FormData();
-        formData.append('file', regulationFile);
-        
+        // Send the raw file so the server can stream it straight to disk
         const uploadResponse = await fetch('/upload-regulation', {
             method: 'POST',
-            body: formData
+            headers: {
+                'Content-Type': 'application/octet-stream',
+                'X-Filename': encodeURIComponent(regulationFile.name)
+            },
+            body: regulationFile
         });
         
         const uploadResult = await uploadResponse.json();
@@ -241,14 +268,7 @@ async function processRegulation() {
         processRegulationBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Processing with AI...';
         showToast('Processing regulation document with AI. This may take a few minutes...', 'success');
         
-        const processResponse = await fetch('/process-regulation', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            }
-        });
-        
-        const processResult = await processResponse.json();
+        const processResult = await runJob('/process-regulation');
         
         stopRegulationLogStream();
         
@@ -289,12 +309,14 @@ async function processProposal() {
     
     try {
         // Upload the file
-        const formData = new FormData();
-        formData.append('file', proposalFile);
-        
+        // Send the raw file so the server can stream it straight to disk
         const uploadResponse = await fetch('/upload-proposal', {
             method: 'POST',
-            body: formData
+            headers: {
+                'Content-Type': 'application/octet-stream',
+                'X-Filename': encodeURIComponent(proposalFile.name)
+            },
+            body: proposalFile
         });
         
         const uploadResult = await uploadResponse.json();
@@ -309,14 +331,7 @@ async function processProposal() {
         // Now process the document
         processProposalBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Processing...';
         
-        const processResponse = await fetch('/process-proposal', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            }
-        });
-        
-        const processResult = await processResponse.json();
+        const processResult = await runJob('/process-proposal');
         
         if (processResult.success) {
             // Update UI with results
@@ -364,7 +379,10 @@ function startLogStream() {
     
     eventSource.onmessage = function(event) {
         const data = JSON.parse(event.data);
-        addLogEntry(data.message, data.level);
+        // The server groups messages sent close together into one batch
+        for (const entry of (data.batch || [data])) {
+            addLogEntry(entry.message, entry.level);
+        }
     };
     
     eventSource.onerror = function(error) {
@@ -396,7 +414,10 @@ function startRegulationLogStream() {
     
     regulationEventSource.onmessage = function(event) {
         const data = JSON.parse(event.data);
-        addRegulationLogEntry(data.message, data.level);
+        // The server groups messages sent close together into one batch
+        for (const entry of (data.batch || [data])) {
+            addRegulationLogEntry(entry.message, entry.level);
+        }
     };
     
     regulationEventSource.onerror = function(error) {